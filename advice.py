@@ -0,0 +1,43 @@
+# --- CONSEILS AFFICHÉS SELON LA BANDE DE RISQUE ---
+# Textes partagés par l'application et le service de scoring : pour chaque bande, le type
+# de message Streamlit, le titre et la liste de conseils (Markdown).
+
+GENRE_AUTRE = "Autre/Ne souhaite pas répondre"
+
+GENRE_AUTRE_TITLE = "ℹ️ Votre profil ne peut pas être évalué par le modèle actuel. Vous trouverez néanmoins ci-dessous des conseils utiles."
+GENRE_AUTRE_ADVICE = """\
+Bien que nous ne puissions pas vous donner de score personnalisé dans ce cas, voici **des conseils utiles** si vous ressentez une charge mentale importante ou des signes d'épuisement :
+
+- **Écoutez vos signaux d’alerte** : troubles du sommeil, fatigue, irritabilité, perte d’envie ou de concentration sont des indicateurs importants.
+- **Parlez-en à un·e professionnel·le de santé** si vous avez un doute ou ressentez un mal-être.
+- **N'attendez pas que la situation s'aggrave** : il est possible de prévenir le burn-out par des ajustements simples dans l'organisation, la charge ou le soutien au travail.
+- **Entourez-vous de personnes de confiance**, au travail ou en dehors, et ne restez pas seul·e.
+- **Consultez votre médecin du travail** si besoin : il peut vous aider à adapter vos conditions de travail.
+"""
+
+ADVICE = (
+    ("success", "✅ Aucun risque préoccupant de burn-out n'est détecté.", """\
+**Vous semblez actuellement dans une situation stable. Bravo !**
+Voici quelques conseils pour **préserver votre équilibre** :
+- Maintenez des **temps de récupération réguliers** : pauses, congés, moments de détente.
+- **Entretenez vos relations sociales** au travail et en dehors : soutien et reconnaissance sont protecteurs.
+- Soyez à l’écoute de vous-même : en cas de changement d’humeur, fatigue persistante ou perte de sens, n’hésitez pas à consulter.
+- Continuez à **vous questionner sur le sens de votre travail**, et à ajuster vos objectifs personnels et professionnels.
+"""),
+    ("info", "⚠️ Un risque modéré de burn-out est détecté.", """\
+**Quelques recommandations pour agir à temps :**
+- **Soyez attentif·ve aux signaux de fatigue** : troubles du sommeil, irritabilité, perte de motivation, etc.
+- **Essayez d’identifier les facteurs de stress** dans votre environnement de travail : surcharge, manque de reconnaissance, tensions relationnelles…
+- **Organisez vos priorités**, apprenez à dire non si besoin, et aménagez-vous des temps de déconnexion.
+- **Échangez avec votre supérieur·e ou RH** si certaines tâches vous semblent insoutenables ou mal comprises.
+- **Envisagez un accompagnement psychologique préventif** (psychologue, thérapeute, groupe de parole).
+"""),
+    ("warning", "⚠️ Le risque de burn-out sévère détecté est très élevé.", """\
+**Voici quelques conseils adaptés à votre situation :**
+- **Consultez rapidement un professionnel de santé** (médecin traitant, psychologue, psychiatre) pour faire le point sur votre état de santé.
+- **Envisagez un arrêt de travail temporaire** si vous êtes en situation d’épuisement avancé. Cela peut vous permettre de prendre du recul et de vous reposer.
+- **Prenez soin de vous** : veillez à votre sommeil, réduisez les surstimulations (notifications, écrans...), et accordez-vous des moments de récupération sans culpabilité.
+- **Ne restez pas isolé·e** : parlez à vos proches, à un collègue de confiance ou à votre médecin du travail. Vous pouvez aussi contacter des associations de soutien.
+- **Pensez à consulter votre médecin du travail** pour un éventuel aménagement de poste (réduction des horaires, baisse de charge, télétravail temporaire...).
+"""),
+)
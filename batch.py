@@ -0,0 +1,148 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from model import BANDS, get_model
+from questions import ENCODER
+
+# --- SCORING PAR LOTS ---
+# Lit un fichier de réponses (CSV, Parquet ou JSONL) par blocs de taille fixe,
+# encode chaque bloc dans une matrice NumPy préallouée et le score en un seul
+# produit matrice-vecteur. La mémoire reste constante quelle que soit la taille du fichier.
+
+CHUNKSIZE = 50_000
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    return "csv"
+
+
+def read_chunks(path, chunksize=CHUNKSIZE, fmt=None):
+    # path : chemin ou fichier ouvert (fmt est alors requis s'il n'a pas d'extension)
+    import pandas as pd
+
+    fmt = fmt or detect_format(path)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        for record_batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield record_batch.to_pandas()
+    elif fmt == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=chunksize)
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def encode_chunk(df, idx_out, numeric_out, out):
+    # Même encodeur que le questionnaire : codes bruts -> indices d'options -> gather
+    n = len(df)
+    idx = ENCODER.frame_indices(df, idx_out)
+    numeric = ENCODER.frame_numeric(df, numeric_out)
+    return ENCODER.encode(idx, numeric, out[:n])
+
+
+def score_chunks(chunks, chunksize=CHUNKSIZE, id_column=None, attribution=False):
+    model = get_model()
+    if attribution:
+        from contributions import contributions, factor_groups, group_matrix, reference_profile
+
+        reference, _ = reference_profile(model)
+        G = group_matrix(model)
+        names = [f"contrib_{q['key']}" for q, _ in factor_groups(model)]
+    # Buffers préalloués une fois, réutilisés pour chaque bloc
+    X = np.empty((chunksize, len(model.features)), dtype=np.float64)
+    idx = np.empty((chunksize, len(ENCODER.categorical)), dtype=np.intp)
+    numeric = np.empty((chunksize, len(ENCODER.numeric)), dtype=np.float64)
+    for df in chunks:
+        for start in range(0, len(df), chunksize):
+            part = df.iloc[start:start + chunksize]
+            Xc = encode_chunk(part, idx, numeric, X)
+            proba = model.probability(Xc)
+            complete = ~np.isnan(proba)
+            bande = np.where(complete, BANDS[np.minimum(model.band(proba), len(BANDS) - 1)], "incomplet")
+            result = {
+                "proba": proba,
+                "prediction": np.where(complete, proba >= model.thresholds[0], False).astype(np.int8),
+                "bande": bande,
+            }
+            if attribution:
+                # Matrice d'attribution (lignes, facteurs) : produit colonne par colonne puis regroupement
+                A = contributions(model, Xc, reference, G)
+                result.update((name, A[:, g]) for g, name in enumerate(names))
+            if id_column is not None:
+                result = {id_column: part[id_column].to_numpy(), **result}
+            yield result
+
+
+class ResultWriter:
+    # Écriture incrémentale des lots de résultats (CSV, Parquet ou JSONL selon l'extension)
+
+    def __init__(self, path):
+        self.path = path
+        self.fmt = detect_format(path)
+        self._parquet = None
+        self._first = True
+
+    def write(self, result):
+        import pandas as pd
+
+        df = pd.DataFrame(result)
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        elif self.fmt == "jsonl":
+            df.to_json(self.path, orient="records", lines=True, force_ascii=False,
+                       mode="w" if self._first else "a")
+        else:
+            df.to_csv(self.path, index=False, header=self._first, mode="w" if self._first else "a")
+        self._first = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Score un fichier de réponses (CSV, Parquet ou JSONL) avec le modèle logit1."
+    )
+    parser.add_argument("input", help="fichier de réponses codées (une ligne par répondant)")
+    parser.add_argument("-o", "--output", required=True, help="fichier de sortie (.csv, .parquet ou .jsonl)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="nombre de lignes par bloc")
+    parser.add_argument("--id-column", help="colonne identifiant à recopier dans la sortie")
+    parser.add_argument("--attribution", action="store_true",
+                        help="ajoute la contribution de chaque facteur (log-odds, par rapport au profil de référence)")
+    args = parser.parse_args(argv)
+    if args.attribution and not get_model().linear:
+        parser.error("--attribution : contributions par facteur disponibles pour le modèle logistique seulement")
+
+    writer = ResultWriter(args.output)
+    n_rows = n_risk = n_missing = 0
+    try:
+        for result in score_chunks(read_chunks(args.input, args.chunksize), args.chunksize, args.id_column,
+                                   args.attribution):
+            writer.write(result)
+            n_rows += len(result["proba"])
+            n_risk += int(result["prediction"].sum())
+            n_missing += int(np.isnan(result["proba"]).sum())
+    finally:
+        writer.close()
+
+    print(f"{n_rows} réponses scorées, {n_risk} au-dessus du seuil {get_model().thresholds[0]}, {n_missing} incomplètes",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
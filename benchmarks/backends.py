@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import sys
+import time
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import naive_log_odds, random_profiles, synthetic_ensemble  # noqa: E402
+from model import BurnoutModel, TreeEnsembleBackend, builtin_model  # noqa: E402
+from questions import ENCODER  # noqa: E402
+
+# --- BACKENDS DE SCORING : LOGISTIQUE CONTRE ENSEMBLE D'ARBRES COMPILÉ ---
+# Latence d'un profil (chemin d'un clic : buffer rempli puis probability_one) et débit par
+# lots (probability sur des profils aléatoires complets) pour chaque backend. Sans --dump,
+# l'ensemble est synthétique (--trees arbres complets de profondeur --depth, coupures sur
+# les valeurs encodées). Le résultat compilé est d'abord comparé à un parcours naïf du JSON.
+#
+#   python benchmarks/backends.py --trees 300 --depth 6 --rows 200000
+#   python benchmarks/backends.py --dump gbm.json
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latence et débit des backends de scoring.")
+    parser.add_argument("--dump", help="ensemble d'arbres exporté en JSON (par défaut : synthétique)")
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--rows", type=int, default=200_000, help="profils du test de débit")
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--json", help="écrit le rapport (JSON)")
+    args = parser.parse_args(argv)
+
+    if args.dump:
+        with open(args.dump, encoding="utf-8") as f:
+            dump = json.load(f)
+    else:
+        dump = synthetic_ensemble(args.trees, args.depth)
+    start = time.perf_counter()
+    trees = BurnoutModel(TreeEnsembleBackend(dump), version="arbres")
+    compile_ms = (time.perf_counter() - start) * 1000
+    models = {"logistique": builtin_model(), "arbres": trees}
+
+    idx, numeric = random_profiles(args.rows)
+    X = ENCODER.encode(idx, numeric)
+    check = [naive_log_odds(dump, x) for x in X[:200]]
+    error = float(np.max(np.abs(trees.log_odds(X[:200]) - check)))
+    error_one = max(abs(trees.log_odds_one(x) - c) for x, c in zip(X[:50], check))
+    if max(error, error_one) > 1e-9:
+        raise SystemExit(f"Évaluateur compilé incorrect : écart max {max(error, error_one):.3g}")
+
+    report = {"trees": len(trees.backend.roots), "nodes": len(trees.backend.feature),
+              "max_depth": trees.backend.depth, "compile_ms": compile_ms, "rows": args.rows}
+    print(f"ensemble : {report['trees']} arbres, {report['nodes']} nœuds, profondeur {report['max_depth']}, "
+          f"compilé en {compile_ms:.0f} ms (écart au parcours naïf {max(error, error_one):.1e})")
+    print(f"{'backend':<12} {'1 profil':>12} {'débit par lots':>18}")
+    for name, model in models.items():
+        buf = model.buffer()
+
+        def one():
+            return model.probability_one(ENCODER.encode(idx[0], numeric[0], buf))
+
+        single = min(timeit.repeat(one, number=args.number, repeat=5)) / args.number
+        model.probability(X[:1000])
+        batch = min(timeit.repeat(lambda: model.probability(X), number=1, repeat=3))
+        report[name] = {"single_us": single * 1e6, "rows_per_s": args.rows / batch}
+        print(f"{name:<12} {single * 1e6:9.1f} µs {args.rows / batch / 1e6:12.2f} M lignes/s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import os
+import random
+import socket
+import subprocess
+import tarfile
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+
+# --- OUTILS COMMUNS AUX BENCHMARKS ET AUX TESTS ---
+# Aucun module de l'application n'est importé au chargement : reruns.py et sessions.py
+# évaluent aussi l'app d'une autre révision (--baseline) dans le même processus, ses
+# modules ne doivent pas être masqués par ceux de l'arbre courant.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXCLUDED = ("sais pas", "Sans objet", "Autre")
+RESTART_LABEL = "Recommencer"
+
+
+# --- Profils et ensembles d'arbres synthétiques ---
+
+def random_profiles(n, seed=0):
+    # Profils complets : options non manquantes tirées uniformément, valeurs numériques dans leurs bornes
+    from questions import ENCODER
+
+    rng = np.random.default_rng(seed)
+    idx = np.empty((n, len(ENCODER.categorical)), dtype=np.intp)
+    for i in range(len(ENCODER.categorical)):
+        allowed = np.flatnonzero(~ENCODER.missing[ENCODER.offsets[i]:ENCODER.offsets[i] + ENCODER.n_options[i]])
+        idx[:, i] = rng.choice(allowed, n)
+    numeric = np.column_stack([rng.integers(q["min"], q["max"] + 1, n) for q in ENCODER.numeric]).astype(np.float64)
+    return idx, numeric
+
+
+def synthetic_ensemble(n_trees, depth, seed=0):
+    # Arbres complets au format JSON de XGBoost ; seuils au milieu de deux valeurs encodées observées
+    from model import FEATURES
+    from questions import ENCODER
+
+    rng = np.random.default_rng(seed)
+    values = [np.unique(ENCODER.table[:, j][~np.isnan(ENCODER.table[:, j])]) for j in range(len(FEATURES))]
+    for j in ENCODER.numeric_cols:
+        q = ENCODER.numeric[list(ENCODER.numeric_cols).index(j)]
+        values[j] = np.arange(q["min"], q["max"] + 1, dtype=np.float64)
+    splittable = [j for j, v in enumerate(values) if len(v) > 1]
+
+    def node(nodeid, level):
+        if level == depth:
+            return {"nodeid": nodeid, "leaf": round(float(rng.normal(0, 0.1)), 6)}
+        j = splittable[rng.integers(len(splittable))]
+        k = rng.integers(1, len(values[j]))
+        yes, no = 2 * nodeid + 1, 2 * nodeid + 2
+        return {"nodeid": nodeid, "depth": level, "split": FEATURES[j],
+                "split_condition": float((values[j][k - 1] + values[j][k]) / 2), "yes": yes, "no": no, "missing": yes,
+                "children": [node(yes, level + 1), node(no, level + 1)]}
+
+    return {"features": FEATURES, "base_margin": -1.0, "trees": [node(0, 0) for _ in range(n_trees)]}
+
+
+def naive_log_odds(dump, x):
+    # Parcours récursif du JSON, nœud par nœud : référence pour vérifier la compilation
+    index = {v: j for j, v in enumerate(dump["features"])}
+    total = dump.get("base_margin", 0.0)
+    for tree in dump["trees"]:
+        node = tree
+        while "leaf" not in node:
+            by_id = {child["nodeid"]: child for child in node["children"]}
+            # Variable nommée, ou « f<j> » (dump XGBoost sans noms de variables)
+            split = node["split"]
+            j = index[split] if split in index else int(split[1:])
+            node = by_id[node["yes"] if x[j] < node["split_condition"] else node["no"]]
+        total += node["leaf"]
+    return total
+
+
+# --- Parcours du questionnaire (harnais AppTest) ---
+
+def respondent(app_path, seed, log):
+    # Générateur : une relance par pas (sauf l'envoi final, dernier pas). Répond dans l'ordre
+    # du document, comme un utilisateur, puis envoie le formulaire. `log` reçoit la durée (s)
+    # de chaque relance.
+    from streamlit.testing.v1 import AppTest
+
+    rnd = random.Random(seed)
+    at = AppTest.from_file(app_path, default_timeout=60)
+
+    def run(action):
+        t = time.perf_counter()
+        action()
+        log.append(time.perf_counter() - t)
+
+    run(at.run)
+    yield
+    done = set()
+    # Les widgets peuvent apparaître au fil des relances : on répond dans l'ordre du document
+    while True:
+        pending = [w for w in list(at.slider) + list(at.selectbox) + list(at.radio) if w.label not in done]
+        if not pending:
+            break
+        w = pending[0]
+        done.add(w.label)
+        if w in at.slider:
+            value = rnd.randint(24, 64)
+        else:
+            value = rnd.choice([o for o in w.options if not any(e in o for e in EXCLUDED)])
+        # Comme dans le navigateur, une valeur inchangée ne déclenche pas de relance
+        if value == w.value:
+            continue
+        w.set_value(value)
+        if not w.form_id:
+            run(at.run)
+            yield
+
+    run(at.button[0].click().run)
+    if not at.metric:
+        raise RuntimeError("Aucun résultat affiché après l'envoi du questionnaire")
+
+
+# --- Application servie par `streamlit run` ---
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def fetch(url, headers=None):
+    # Renvoie (octets transmis, en-têtes, corps) sans décompression : corps tel qu'il passe sur le réseau
+    request = urllib.request.Request(url, headers={"Accept-Encoding": "gzip, br", **(headers or {})})
+    try:
+        with urllib.request.urlopen(request) as r:
+            body = r.read()
+            return len(body) + sum(len(k) + len(v) + 4 for k, v in r.headers.items()), r.headers, body
+    except urllib.error.HTTPError as e:
+        return sum(len(k) + len(v) + 4 for k, v in e.headers.items()), e.headers, b""
+
+
+def wait_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fetch(f"http://127.0.0.1:{port}/_stcore/health")
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def connect(port):
+    from websockets.sync.client import connect as ws_connect
+
+    # Sans compression : octets comparables d'une mesure à l'autre
+    return ws_connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"],
+                      compression=None, max_size=None)
+
+
+# --- Processus et révisions ---
+
+def rss():
+    # Mémoire résidente du processus (octets) ; à défaut de /proc, le pic (ru_maxrss)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def export_revision(rev, dest):
+    # Copie de l'arbre d'une révision git dans dest (comparaisons avec --baseline) ; renvoie son app.py
+    archive = os.path.join(dest, "rev.tar")
+    subprocess.run(["git", "archive", "-o", archive, rev], cwd=ROOT, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(dest, filter="data")
+    return os.path.join(dest, "app.py")
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from common import EXCLUDED  # noqa: E402
+from questions import QUESTIONS  # noqa: E402
+
+# --- GÉNÉRATEUR DE CHARGE POUR service.py ---
+# Ouvre N connexions keep-alive qui envoient des profils valides aléatoires et mesure
+# la latence de chaque requête. Rapporte p50/p99 et requêtes/s.
+#
+#   python benchmarks/load_service.py --spawn --concurrency 64 --requests 20000
+
+
+def random_payload(rnd):
+    answers = {}
+    for q in QUESTIONS:
+        if "options" in q:
+            answers[q["key"]] = rnd.choice([o for o in q["options"] if not any(e in o for e in EXCLUDED)])
+        else:
+            answers[q["key"]] = rnd.randint(24, q["max"])
+    return json.dumps(answers).encode()
+
+
+async def client(host, port, payloads, latencies, counter):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] > 0:
+            counter[0] -= 1
+            body = payloads[counter[0] % len(payloads)]
+            request = (
+                f"POST /score HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode() + body
+            t0 = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+            if b" 200 " not in status:
+                raise RuntimeError(f"Réponse inattendue : {status!r}")
+    finally:
+        writer.close()
+
+
+async def run(host, port, concurrency, requests):
+    rnd = random.Random(0)
+    payloads = [random_payload(rnd) for _ in range(1000)]
+    latencies = []
+    counter = [requests]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(host, port, payloads, latencies, counter) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    lat = np.array(latencies) * 1000
+    return {
+        "requests": len(lat),
+        "concurrency": concurrency,
+        "rps": len(lat) / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+    }
+
+
+async def _wait_ready(host, port, timeout=15):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Charge HTTP contre une instance locale de service.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--spawn", action="store_true", help="démarre service.py le temps du test")
+    parser.add_argument("service_args", nargs="*", help="arguments transmis à service.py avec --spawn")
+    args = parser.parse_args(argv)
+
+    proc = None
+    if args.spawn:
+        proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "service.py"), "--host", args.host,
+                                 "--port", str(args.port), *args.service_args])
+    try:
+        asyncio.run(_wait_ready(args.host, args.port))
+        report = asyncio.run(run(args.host, args.port, args.concurrency, args.requests))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
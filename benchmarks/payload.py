@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from common import RESTART_LABEL, connect, export_revision, free_port, wait_ready  # noqa: E402
+from questions import QUESTION_BY_KEY  # noqa: E402
+
+# --- VOLUME ENVOYÉ AU NAVIGATEUR PAR RERUN ---
+# Lance `streamlit run` et rejoue un parcours par le protocole websocket du navigateur :
+# chargement de la page, changement de genre, envoi du questionnaire (réponses par défaut),
+# ouverture de « Pourquoi ce score ? », puis « Recommencer ». Pour chaque rerun : messages delta reçus et octets (messages
+# ForwardMsg sérialisés, sans compression). Les interactions avec un widget situé dans un
+# fragment ne relancent que ce fragment, comme dans le navigateur.
+#
+#   python benchmarks/payload.py                      # version courante
+#   python benchmarks/payload.py --baseline HEAD~1    # comparaison avec une révision git
+
+SUBMIT_LABEL = "Lancer l’analyse"
+EXPLAIN_LABEL = "Pourquoi ce score"
+
+
+class Session:
+    # Connexion websocket d'un navigateur : widgets vus au dernier rendu (identifiant, fragment)
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}
+
+    def rerun(self, states=(), fragment_id=""):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        back = BackMsg()
+        back.rerun_script.query_string = ""
+        back.rerun_script.page_script_hash = ""
+        back.rerun_script.fragment_id = fragment_id
+        back.rerun_script.widget_states.widgets.extend(states)
+        self.ws.send(back.SerializeToString())
+        stats = {"messages": 0, "deltas": 0, "bytes": 0, "delta_bytes": 0}
+        while True:
+            raw = self.ws.recv(timeout=60)
+            msg = ForwardMsg()
+            msg.ParseFromString(raw)
+            stats["messages"] += 1
+            stats["bytes"] += len(raw)
+            kind = msg.WhichOneof("type")
+            if kind == "delta":
+                stats["deltas"] += 1
+                stats["delta_bytes"] += len(raw)
+                delta = msg.delta
+                if delta.WhichOneof("type") == "new_element":
+                    widget = getattr(delta.new_element, delta.new_element.WhichOneof("type"))
+                elif delta.WhichOneof("type") == "add_block" and delta.add_block.WhichOneof("type") == "expandable":
+                    widget = delta.add_block.expandable  # encadré à chargement différé
+                else:
+                    continue
+                if hasattr(widget, "id") and hasattr(widget, "label") and widget.id:
+                    self.widgets[widget.label] = (widget.id, delta.fragment_id)
+            elif kind == "script_finished":
+                return stats
+
+    def find(self, text):
+        return next(((label, *v) for label, v in self.widgets.items() if text in label), None)
+
+
+def walk(port):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    genre = QUESTION_BY_KEY["genre"]
+    other = list(genre["options"])[1]
+    report = {}
+    with connect(port) as ws:
+        session = Session(ws)
+        report["page_load"] = session.rerun()
+
+        _, genre_id, fragment = session.find(genre["label"])
+        genre_state = WidgetState(id=genre_id, string_value=other)
+        report["genre_change"] = session.rerun([genre_state], fragment)
+
+        found = session.find(SUBMIT_LABEL)
+        if found:
+            _, submit_id, fragment = found
+            report["submit"] = session.rerun([genre_state, WidgetState(id=submit_id, trigger_value=True)], fragment)
+
+        # Encadré à chargement différé : son ouverture fait l'objet d'un rerun séparé
+        found = session.find(EXPLAIN_LABEL)
+        if found:
+            _, explain_id, fragment = found
+            report["open_explanation"] = session.rerun([genre_state, WidgetState(id=explain_id, bool_value=True)], fragment)
+
+        found = session.find(RESTART_LABEL)
+        if found:
+            _, restart_id, fragment = found
+            report["restart"] = session.rerun([genre_state, WidgetState(id=restart_id, trigger_value=True)], fragment)
+    return report
+
+
+def measure(app_path):
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", app_path, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=os.path.dirname(os.path.abspath(app_path)), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port)
+        walk(port)  # échauffement : imports et compilation hors mesure
+        report = walk(port)
+    finally:
+        proc.terminate()
+        proc.wait()
+    report["total_bytes"] = sum(step["bytes"] for step in report.values())
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Messages delta et octets envoyés au navigateur par rerun.")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--baseline", help="révision git de référence (ex. HEAD~1)")
+    args = parser.parse_args(argv)
+
+    report = {"current": measure(os.path.abspath(args.app))}
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            report["baseline"] = measure(export_revision(args.baseline, tmp))
+        report["bytes_reduction"] = {
+            step: 1 - report["current"][step]["bytes"] / report["baseline"][step]["bytes"]
+            for step in report["current"] if step in report["baseline"] and step != "total_bytes"
+        }
+        report["bytes_reduction"]["total"] = 1 - report["current"]["total_bytes"] / report["baseline"]["total_bytes"]
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, export_revision, respondent
+
+# --- RELANCES ET CPU PAR ÉVALUATION COMPLÈTE ---
+# Simule des répondants avec le harnais AppTest de Streamlit : chaque widget hors
+# formulaire provoque une relance du script, les widgets d'un formulaire n'en
+# provoquent qu'une à l'envoi. On compte les relances et le temps CPU du processus
+# (script + sérialisation des messages) jusqu'à l'affichage du résultat.
+#
+#   python benchmarks/reruns.py                      # version courante
+#   python benchmarks/reruns.py --baseline HEAD~1    # comparaison avec une révision git
+
+
+
+def simulate(app_path, seed):
+    # Un répondant jusqu'au résultat : (relances, temps CPU du processus en s)
+    log = []
+    cpu = time.process_time()
+    for _ in respondent(app_path, seed, log):
+        pass
+    return len(log), time.process_time() - cpu
+
+
+def measure(app_path, sessions):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(app_path)))
+    simulate(app_path, seed=-1)  # échauffement : imports et compilation hors mesure
+    results = [simulate(app_path, seed) for seed in range(sessions)]
+    return {
+        "app": app_path,
+        "sessions": sessions,
+        "reruns_per_assessment": sum(r for r, _ in results) / sessions,
+        "cpu_ms_per_assessment": 1000 * sum(c for _, c in results) / sessions,
+    }
+
+
+def _run_isolated(app_path, sessions):
+    # Un processus par version : les modules importés par l'app ne se mélangent pas
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--app", app_path, "--sessions", str(sessions), "--raw"],
+        cwd=os.path.dirname(os.path.abspath(app_path)), check=True, capture_output=True, text=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Relances et CPU serveur par évaluation complète.")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--baseline", help="révision git de référence (ex. HEAD~1)")
+    parser.add_argument("--raw", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.raw:
+        print(json.dumps(measure(args.app, args.sessions)))
+        return
+
+    report = {"current": _run_isolated(args.app, args.sessions)}
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            report["baseline"] = _run_isolated(export_revision(args.baseline, tmp), args.sessions)
+            report["baseline"]["app"] = args.baseline
+        for metric in ("reruns_per_assessment", "cpu_ms_per_assessment"):
+            report[f"{metric}_reduction"] = 1 - report["current"][metric] / report["baseline"][metric]
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
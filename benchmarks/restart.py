@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from common import RESTART_LABEL, ROOT, connect, fetch, free_port, wait_ready
+
+# --- RECOMMENCER : BOUTON DE L'APPLICATION CONTRE RECHARGEMENT DE LA PAGE (F5) ---
+# Lance `streamlit run app.py` sur un port local et rejoue le protocole du navigateur :
+#  - F5 : page HTML, ressources statiques qu'elle référence, points de contrôle du serveur,
+#    nouvelle connexion websocket et premier rendu complet ;
+#  - F5 avec cache : idem, les ressources à longue durée de cache n'étant pas redemandées ;
+#  - bouton « Recommencer » : un seul message sur la connexion existante, puis le rerun.
+# Mesure les octets reçus (corps HTTP tels que transmis, messages websocket) et le temps
+# jusqu'à la fin du script (interactivité côté serveur ; l'analyse du JS par le navigateur
+# et les modules chargés à la demande ne sont pas comptés : le coût du F5 est sous-estimé).
+#
+#   python benchmarks/restart.py --repeat 20
+
+def assets(html):
+    return sorted(set(re.findall(r'(?:src|href)="\.?/?(static/[^"]+)"', html)))
+
+
+def long_cached(headers):
+    # Ressources nommées par empreinte, servies avec une longue durée de cache : le navigateur
+    # ne les redemande pas lors d'un rechargement normal
+    cache = headers.get("Cache-Control", "")
+    match = re.search(r"max-age=(\d+)", cache)
+    return "immutable" in cache or (match is not None and int(match.group(1)) > 0)
+
+
+def rerun(ws, widget_states=None):
+    # Envoie une demande de rerun et lit les messages jusqu'à la fin du script.
+    # Renvoie (octets reçus, octets envoyés, messages reçus, identifiant du bouton Recommencer)
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    back = BackMsg()
+    back.rerun_script.query_string = ""
+    back.rerun_script.page_script_hash = ""
+    for state in widget_states or []:
+        back.rerun_script.widget_states.widgets.append(state)
+    data = back.SerializeToString()
+    ws.send(data)
+    received, messages, restart_id = 0, 0, None
+    while True:
+        raw = ws.recv(timeout=60)
+        received += len(raw)
+        messages += 1
+        msg = ForwardMsg()
+        msg.ParseFromString(raw)
+        kind = msg.WhichOneof("type")
+        if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+            element = msg.delta.new_element
+            if element.WhichOneof("type") == "button" and RESTART_LABEL in element.button.label:
+                restart_id = element.button.id
+        elif kind == "script_finished":
+            return received, len(data), messages, restart_id
+
+
+def page_load(port, cached):
+    # Rechargement complet : HTTP puis nouvelle session websocket et premier rendu
+    base = f"http://127.0.0.1:{port}/"
+    start = time.perf_counter()
+    http_bytes, _, html = fetch(base)
+    for path in assets(html.decode("utf-8", "replace")):
+        size, headers, _ = fetch(base + path)
+        if not (cached and long_cached(headers)):
+            http_bytes += size
+    for path in ("_stcore/health", "_stcore/host-config"):
+        http_bytes += fetch(base + path)[0]
+    with connect(port) as ws:
+        received, sent, messages, restart_id = rerun(ws)
+    elapsed = time.perf_counter() - start
+    return {"ms": elapsed * 1000, "bytes": http_bytes + received + sent, "http_bytes": http_bytes,
+            "ws_bytes": received + sent, "messages": messages}, restart_id
+
+
+def restart(ws, restart_id):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    state = WidgetState(id=restart_id, trigger_value=True)
+    start = time.perf_counter()
+    received, sent, messages, _ = rerun(ws, [state])
+    return {"ms": (time.perf_counter() - start) * 1000, "bytes": received + sent, "http_bytes": 0,
+            "ws_bytes": received + sent, "messages": messages}
+
+
+def summarize(runs):
+    out = {}
+    for key in ("ms", "bytes", "http_bytes", "ws_bytes", "messages"):
+        values = np.array([r[key] for r in runs], dtype=float)
+        out[f"{key}_p50"] = float(np.percentile(values, 50))
+    out["ms_p95"] = float(np.percentile([r["ms"] for r in runs], 95))
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bouton Recommencer contre rechargement complet de la page.")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="écrit le rapport (JSON)")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", args.app, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port)
+        # Premier rendu hors mesure (imports, compilation du script)
+        _, restart_id = page_load(port, cached=False)
+        if restart_id is None:
+            raise RuntimeError(f"Bouton « {RESTART_LABEL} » introuvable dans {args.app}")
+
+        report = {}
+        for name, cached in (("reload_cold", False), ("reload_cached", True)):
+            report[name] = summarize([page_load(port, cached)[0] for _ in range(args.repeat)])
+        with connect(port) as ws:
+            rerun(ws)
+            report["restart_button"] = summarize([restart(ws, restart_id) for _ in range(args.repeat)])
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    for name in ("reload_cold", "reload_cached"):
+        report[f"{name}_vs_restart"] = {
+            "bytes": report[name]["bytes_p50"] / report["restart_button"]["bytes_p50"],
+            "ms": report[name]["ms_p50"] / report["restart_button"]["ms_p50"],
+        }
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import ResultCache, assess  # noqa: E402
+from common import random_profiles  # noqa: E402
+from model import get_model  # noqa: E402
+from questions import ENCODER  # noqa: E402
+
+# --- CACHE DES RÉSULTATS : TAUX DE SUCCÈS ET COÛT D'UNE SOUMISSION ---
+# Rejoue --submissions soumissions tirées parmi --profiles profils distincts selon une loi
+# de Zipf (quelques combinaisons de réponses très fréquentes, une longue traîne), avec et
+# sans cache, sur le chemin de calcul d'une soumission complète de l'application : encodage,
+# score, intervalle, percentile et leviers « Et si… ». Le rendu Streamlit n'est pas compté.
+#
+#   python benchmarks/result_cache.py --profiles 5000 --submissions 50000 --size 4096
+#   python benchmarks/result_cache.py --zipf 1.3 --size 1024
+
+
+def replay(model, idx, numeric, order, cache):
+    buf = model.buffer()
+    times = np.empty(len(order))
+    for n, i in enumerate(order):
+        start = time.perf_counter()
+        x = ENCODER.encode(idx[i], numeric[i], buf)
+        cache.lookup(model, x, lambda: assess(
+            model, model.log_odds_one(x), model.probability_one(x), x, idx[i], numeric[i]))
+        times[n] = time.perf_counter() - start
+    return times
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Taux de succès du cache des résultats et coût d'une soumission.")
+    parser.add_argument("--profiles", type=int, default=5000, help="profils distincts")
+    parser.add_argument("--submissions", type=int, default=50_000)
+    parser.add_argument("--zipf", type=float, default=1.1, help="exposant de la loi de Zipf des profils")
+    parser.add_argument("--size", type=int, default=4096, help="capacité du cache")
+    parser.add_argument("--json", help="écrit le rapport (JSON)")
+    args = parser.parse_args(argv)
+
+    model = get_model()
+    idx, numeric = random_profiles(args.profiles)
+    rng = np.random.default_rng(1)
+    weights = 1 / np.arange(1, args.profiles + 1) ** args.zipf
+    order = rng.choice(args.profiles, args.submissions, p=weights / weights.sum())
+
+    report = {"profiles": args.profiles, "submissions": args.submissions, "zipf": args.zipf}
+    for name, size in (("sans_cache", 0), ("cache", args.size)):
+        cache = ResultCache(size=size, ttl=float("inf"))
+        times = replay(model, idx, numeric, order, cache) * 1e6
+        report[name] = {"mean_us": float(times.mean()), "p50_us": float(np.percentile(times, 50)),
+                        "p95_us": float(np.percentile(times, 95)), "total_s": float(times.sum() / 1e6)}
+        if size:
+            report[name].update(cache.stats())
+    report["speedup"] = report["sans_cache"]["total_s"] / report["cache"]["total_s"]
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import COEFFICIENTS, get_model  # noqa: E402
+from questions import ENCODER, QUESTIONS  # noqa: E402
+from shadow import SHADOW  # noqa: E402
+from whatif import WHATIF  # noqa: E402
+
+# --- COÛT DU SCORING PAR CLIC ---
+# Compare le chemin historique (dict de coefficients reconstruit, DataFrame d'une ligne,
+# réindexation puis np.dot) au modèle partagé qui remplit un buffer réutilisé, et
+# mesure le panneau « Et si… » (toutes les alternatives scorées en un produit) et,
+# si des modèles fantômes sont configurés, le surcoût du scoring fantôme.
+#
+#   python benchmarks/scoring.py --number 20000
+
+
+def profile():
+    # Première option de chaque question (profil complet, sans réponse manquante)
+    answers = {q["key"]: next(iter(q["options"])) for q in QUESTIONS if "options" in q}
+    answers["genre"] = "Femme"
+    answers["revenu"] = "1701–2250"
+    answers["age"] = 40
+    return answers
+
+
+def legacy(answers):
+    import pandas as pd
+
+    coefficients = dict(COEFFICIENTS)
+    X_input = pd.DataFrame([dict(zip(ENCODER.features, ENCODER.encode_answers(answers)))])
+    X_input["const"] = 1
+    X_input = X_input[list(coefficients.keys())]
+    X_array = X_input.values[0]
+    coef_array = np.array(list(coefficients.values()))
+    log_odds = np.dot(X_array, coef_array)
+    return 1 / (1 + np.exp(-log_odds))
+
+
+def cached(answers):
+    model = get_model()
+    idx = ENCODER.indices(answers)
+    x = ENCODER.encode(idx, ENCODER.numeric_values(answers), model.buffer())
+    return model.probability_one(x)
+
+
+def shadow(answers):
+    model = get_model()
+    idx = ENCODER.indices(answers)
+    x = ENCODER.encode(idx, ENCODER.numeric_values(answers), model.buffer())
+    proba = model.probability_one(x)
+    SHADOW.observe(model, x)
+    return proba
+
+
+def whatif(answers):
+    model = get_model()
+    idx = ENCODER.indices(answers)
+    numeric = ENCODER.numeric_values(answers)
+    proba = model.probability_one(ENCODER.encode(idx, numeric, model.buffer()))
+    return WHATIF.improvements(model, idx, numeric, proba, top=5)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmark du scoring d'un profil.")
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    answers = profile()
+    assert abs(legacy(answers) - cached(answers)) < 1e-12
+
+    cases = [("dict + DataFrame", legacy), ("modèle partagé", cached), (f"et si ({len(WHATIF.questions)} alt.)", whatif)]
+    if SHADOW.shadows():
+        cases.append((f"+ {len(SHADOW.shadows())} fantôme(s)", shadow))
+    for name, fn in cases:
+        number = max(1, args.number // 20) if fn is legacy else args.number
+        best = min(timeit.repeat(lambda: fn(answers), number=number, repeat=args.repeat)) / number
+        print(f"{name:<18} {best * 1e6:9.2f} µs / clic")
+
+
+if __name__ == "__main__":
+    main()
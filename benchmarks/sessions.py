@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from common import ROOT, rss
+from common import respondent as _respondent
+
+# --- LATENCE DES RELANCES SOUS CHARGE (SESSIONS CONCURRENTES) ---
+# Pilote le questionnaire avec le harnais AppTest de Streamlit. Chaque processus ouvre
+# plusieurs sessions qui progressent à tour de rôle (toutes restent vivantes en mémoire,
+# comme des utilisateurs simultanés) ; plusieurs processus tournent en parallèle.
+# Mesure le temps de chaque relance, les relances par évaluation, le temps total jusqu'au
+# résultat et la mémoire par session, puis compare aux budgets (code de sortie 1 si dépassés).
+#
+#   python benchmarks/sessions.py --processes 4 --sessions 64 --json sessions.json
+#   python benchmarks/sessions.py --compare sessions.json --tolerance 0.2
+
+# Budgets par défaut : p95 d'une relance et du temps de calcul propre à une évaluation (somme
+# de ses relances), relances par évaluation, Mo par session. Le temps de bout en bout sous
+# charge dépend du nombre de sessions par cœur : il n'est contrôlé que face à une référence (--compare).
+BUDGETS = {
+    "rerun_ms_p95": 500.0,
+    "service_ms_p95": 1000.0,
+    "reruns_per_assessment": 4.0,
+    "mb_per_session": 10.0,
+}
+COMPARED = tuple(BUDGETS) + ("end_to_end_ms_p95",)
+
+
+def rss_mb():
+    return rss() / 2**20
+
+
+def respondent(app_path, seed, log):
+    # Parcours de reruns.py, une relance par pas ; renvoie le temps total jusqu'au résultat (s)
+    start = time.perf_counter()
+    yield from _respondent(app_path, seed, log)
+    return time.perf_counter() - start
+
+
+def _worker(app_path, seeds):
+    # Sessions entrelacées dans un processus : chaque tour fait avancer chaque session d'une relance
+    sys.path.insert(0, os.path.dirname(os.path.abspath(app_path)))
+    list(respondent(app_path, -1, []))  # échauffement : imports et compilation hors mesure
+    base = rss_mb()
+    peak = base
+    live = []
+    for seed in seeds:
+        log = []
+        live.append((respondent(app_path, seed, log), log))
+    end_to_end, reruns, service = [], [], []
+    sessions = []
+    while live:
+        still = []
+        for gen, log in live:
+            try:
+                next(gen)
+                still.append((gen, log))
+            except StopIteration as stop:
+                end_to_end.append(stop.value)
+                reruns.append(len(log))
+                service.append(sum(log))
+                sessions.append(log)
+        peak = max(peak, rss_mb())
+        live = still
+    return {
+        "rerun_s": [t for log in sessions for t in log],
+        "end_to_end_s": end_to_end,
+        "service_s": service,
+        "reruns": reruns,
+        "mb_per_session": (peak - base) / len(seeds),
+    }
+
+
+def measure(app_path, processes, sessions, seed=0):
+    # Répartit les sessions sur les processus ; chaque session a sa graine (parcours reproductible)
+    seeds = list(range(seed, seed + sessions))
+    shards = [seeds[k::processes] for k in range(processes) if seeds[k::processes]]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(len(shards)) as pool:
+        results = list(pool.map(_worker, [app_path] * len(shards), shards))
+    elapsed = time.perf_counter() - start
+
+    rerun_ms = 1000 * np.concatenate([r["rerun_s"] for r in results])
+    e2e_ms = 1000 * np.concatenate([r["end_to_end_s"] for r in results])
+    service_ms = 1000 * np.concatenate([r["service_s"] for r in results])
+    report = {
+        "app": app_path,
+        "processes": len(shards),
+        "sessions": sessions,
+        "wall_s": elapsed,
+        "assessments_per_s": sessions / elapsed,
+        "reruns_per_assessment": float(np.mean(np.concatenate([r["reruns"] for r in results]))),
+        "mb_per_session": float(np.mean([r["mb_per_session"] for r in results])),
+    }
+    for name, values in (("rerun_ms", rerun_ms), ("service_ms", service_ms), ("end_to_end_ms", e2e_ms)):
+        for q in (50, 95, 99):
+            report[f"{name}_p{q}"] = float(np.percentile(values, q))
+    return report
+
+
+def check(report, budgets, baseline=None, tolerance=0.2):
+    # Dépassements : budgets absolus, puis dégradation de plus de `tolerance` par rapport à une mesure de référence
+    failures = [f"{k} = {report[k]:.2f} > budget {v:.2f}" for k, v in budgets.items() if report[k] > v]
+    if baseline is not None:
+        failures += [
+            f"{k} = {report[k]:.2f} > référence {baseline[k]:.2f} × {1 + tolerance:.2f}"
+            for k in COMPARED if k in baseline and report[k] > baseline[k] * (1 + tolerance)
+        ]
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latence des relances de l'application sous sessions concurrentes.")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--sessions", type=int, default=64, help="sessions au total (réparties sur les processus)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="écrit le rapport (JSON)")
+    parser.add_argument("--compare", help="rapport JSON de référence : échoue si une métrique se dégrade")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="dégradation tolérée par rapport à la référence")
+    for key, value in BUDGETS.items():
+        parser.add_argument(f"--budget-{key.replace('_', '-')}", dest=key, type=float, default=value)
+    args = parser.parse_args(argv)
+
+    report = measure(os.path.abspath(args.app), args.processes, args.sessions, args.seed)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    budgets = {key: getattr(args, key) for key in BUDGETS}
+    report["budgets"] = budgets
+    report["failures"] = check(report, budgets, baseline, args.tolerance)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if report["failures"]:
+        print("Régression : " + "; ".join(report["failures"]), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import argparse
+import inspect
+import json
+import os
+import subprocess
+import sys
+
+from common import ROOT, rss
+
+# --- BUDGET DE DÉMARRAGE À FROID ---
+# Lance l'application dans un interpréteur neuf (mode « bare » de Streamlit, premier
+# rendu compris) et mesure pour chaque module importé le temps et la mémoire résidente
+# cumulés. Échoue (code 1) si le démarrage dépasse le budget.
+#
+#   python benchmarks/startup.py --top 15
+#   python benchmarks/startup.py --budget-ms 1500 --budget-mb 120 --json startup.json
+
+# Budget par défaut du démarrage à froid (import + premier rendu de app.py)
+BUDGET_MS = 1500
+BUDGET_MB = 120
+
+
+# Exécuté dans le processus enfant (précédé de la source de rss) : un crochet sur __import__
+# enregistre, pour chaque premier import absolu, le temps et la RSS cumulés (sous-imports compris)
+_CHILD = inspect.getsource(rss) + r"""
+import builtins, json, os, runpy, sys, time
+
+_import = builtins.__import__
+records = []
+depth = [0]
+
+def hook(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _import(name, globals, locals, fromlist, level)
+    depth[0] += 1
+    t0, m0 = time.perf_counter(), rss()
+    try:
+        return _import(name, globals, locals, fromlist, level)
+    finally:
+        depth[0] -= 1
+        records.append({"module": name, "depth": depth[0],
+                        "ms": 1000 * (time.perf_counter() - t0), "rss_mb": (rss() - m0) / 2**20})
+
+app = sys.argv[1]
+sys.path.insert(0, os.path.dirname(app))
+m0 = rss()
+t0 = time.perf_counter()
+builtins.__import__ = hook
+try:
+    runpy.run_path(app, run_name="__main__")
+finally:
+    builtins.__import__ = _import
+total_ms = 1000 * (time.perf_counter() - t0)
+print(json.dumps({"total_ms": total_ms, "rss_mb": rss() / 2**20, "base_rss_mb": m0 / 2**20,
+                  "modules": records}))
+"""
+
+
+def measure(app_path):
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, os.path.abspath(app_path)],
+        cwd=os.path.dirname(os.path.abspath(app_path)), check=True, capture_output=True, text=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Temps d'import et RSS par module au démarrage de l'application.")
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--budget-mb", type=float, default=BUDGET_MB)
+    parser.add_argument("--runs", type=int, default=3, help="démarrages mesurés (on garde la médiane)")
+    parser.add_argument("--top", type=int, default=10, help="modules de premier niveau affichés")
+    parser.add_argument("--json", help="écrit le rapport complet dans ce fichier")
+    args = parser.parse_args(argv)
+
+    runs = sorted((measure(args.app) for _ in range(args.runs)), key=lambda r: r["total_ms"])
+    report = runs[len(runs) // 2]
+
+    top = sorted((r for r in report["modules"] if r["depth"] == 0), key=lambda r: -r["ms"])
+    print(f"{'module':<40} {'ms':>9} {'RSS Mo':>8}")
+    for r in top[:args.top]:
+        print(f"{r['module']:<40} {r['ms']:9.1f} {r['rss_mb']:8.1f}")
+    print(f"{'total (import + premier rendu)':<40} {report['total_ms']:9.1f} {report['rss_mb']:8.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    over = []
+    if report["total_ms"] > args.budget_ms:
+        over.append(f"temps {report['total_ms']:.0f} ms > {args.budget_ms:.0f} ms")
+    if report["rss_mb"] > args.budget_mb:
+        over.append(f"RSS {report['rss_mb']:.0f} Mo > {args.budget_mb:.0f} Mo")
+    if over:
+        print("Budget de démarrage dépassé : " + ", ".join(over), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
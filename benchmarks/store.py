@@ -0,0 +1,110 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model import get_model  # noqa: E402
+from questions import ENCODER  # noqa: E402
+from store import ResultStore, connect, record  # noqa: E402
+
+# --- DÉBIT DU STOCKAGE DES RÉSULTATS ---
+# N sessions concurrentes (threads, comme les sessions Streamlit) enregistrent chacune
+# M résultats. Compare l'écriture synchrone (une transaction par résultat, dans le thread
+# de la session) à la file bornée vidée par lots par le thread d'écriture de store.py.
+# Rapporte le temps passé par la session dans l'enregistrement (p50/p99) et le débit.
+#
+#   python benchmarks/store.py --sessions 200 --results 50
+
+
+def rows(n, seed=0):
+    # Résultats plausibles : indices d'options tirés au hasard, âge entre 24 et 64 ans
+    rng = np.random.default_rng(seed)
+    model = get_model()
+    idx = (rng.random((n, len(ENCODER.categorical))) * ENCODER.n_options).astype(np.intp)
+    numeric = rng.integers(24, 65, (n, len(ENCODER.numeric))).astype(np.float64)
+    proba = rng.random(n)
+    return [record(model, idx[i], numeric[i], proba[i], model.band(proba[i])) for i in range(n)]
+
+
+def synchronous(path, sessions, per_session, data):
+    connect(path).close()
+    local = threading.local()
+
+    def save(row):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = sqlite3.connect(path, timeout=60)
+        with conn:
+            conn.execute("INSERT INTO results (day, model_version, probability, band, codes, age_group) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", row)
+
+    return _run(save, sessions, per_session, data)
+
+
+def queued(path, sessions, per_session, data):
+    store = ResultStore(path)
+    latencies, start = _run(store.submit, sessions, per_session, data)
+    # Le débit compte aussi la vidange de la file (close attend le thread d'écriture)
+    store.close()
+    return latencies, start, store
+
+
+def _run(save, sessions, per_session, data):
+    # Renvoie les latences par appel et l'instant (perf_counter) où toutes les sessions démarrent
+    latencies = [[] for _ in range(sessions)]
+    barrier = threading.Barrier(sessions + 1)
+
+    def session(s):
+        barrier.wait()
+        out = latencies[s]
+        for i in range(per_session):
+            row = data[(s * per_session + i) % len(data)]
+            t = time.perf_counter()
+            save(row)
+            out.append(time.perf_counter() - t)
+
+    threads = [threading.Thread(target=session, args=(s,)) for s in range(sessions)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    return np.concatenate(latencies), start
+
+
+def _report(name, latencies, start, path):
+    elapsed = time.perf_counter() - start
+    with sqlite3.connect(path) as conn:
+        n = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1e6
+    print(f"{name:<12} session p50 {p50:9.1f} µs  p99 {p99:9.1f} µs  {n} lignes en {elapsed:.2f} s ({n / elapsed:,.0f} lignes/s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Débit du stockage des résultats sous sessions concurrentes.")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--results", type=int, default=50, help="résultats enregistrés par session")
+    args = parser.parse_args(argv)
+
+    data = rows(10_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sync.sqlite")
+        latencies, start = synchronous(path, args.sessions, args.results, data)
+        _report("synchrone", latencies, start, path)
+
+        path = os.path.join(tmp, "queue.sqlite")
+        latencies, start, store = queued(path, args.sessions, args.results, data)
+        _report("file + lots", latencies, start, path)
+        print(f"{store.batches} lots, {store.dropped} résultats perdus (file pleine)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model import get_model
+from questions import ENCODER
+
+# --- BOOTSTRAP PARAMÉTRIQUE HORS LIGNE ---
+# Tire des milliers de vecteurs de coefficients dans N(β, Σ) et score des fichiers
+# entiers avec chacun d'eux. Les blocs de lignes sont répartis sur un pool de
+# processus ; les tirages sont envoyés une seule fois à chaque worker. Le calcul est
+# dominé par le produit (lignes × variables) @ (variables × tirages) : il passe à
+# l'échelle linéairement avec le nombre de cœurs.
+#
+#   python bootstrap.py reponses.csv -o intervalles.csv --draws 2000 --workers 8
+
+DRAWS = 2000
+LEVEL = 0.95
+# Lignes par tâche : (lignes × tirages) flottants en mémoire dans chaque worker
+ROWS_PER_TASK = 2000
+
+_draws = _model = None
+
+
+def draw_coefficients(model, draws=DRAWS, seed=0):
+    # Tableau (tirages, 1 + variables) : constante en première colonne
+    if model.cov is None:
+        raise ValueError("Le modèle n'a pas de matrice de covariance : bootstrap impossible")
+    mean = np.concatenate([[model.intercept], model.coef])
+    return np.random.default_rng(seed).multivariate_normal(mean, model.cov, size=draws, method="cholesky")
+
+
+def _init_worker(draws, model):
+    global _draws, _model
+    _draws, _model = draws, model
+
+
+def _score_task(X, level):
+    # Probabilités (lignes, tirages) puis quantiles par ligne ; les lignes incomplètes restent NaN.
+    # Même recalibration que l'estimation ponctuelle (bandes), sinon celle-ci peut sortir de l'intervalle
+    proba = _model.calibrate(X @ _draws[:, 1:].T + _draws[:, 0])
+    q = np.quantile(proba, [(1 - level) / 2, (1 + level) / 2], axis=1)
+    return proba.mean(axis=1), q[0], q[1]
+
+
+def _tasks(chunks, id_column):
+    for df in chunks:
+        X = ENCODER.encode(ENCODER.frame_indices(df), ENCODER.frame_numeric(df))
+        ids = df[id_column].to_numpy() if id_column else None
+        for start in range(0, len(df), ROWS_PER_TASK):
+            yield X[start:start + ROWS_PER_TASK], None if ids is None else ids[start:start + ROWS_PER_TASK]
+
+
+def bootstrap_intervals(chunks, draws, level=LEVEL, workers=None, id_column=None):
+    # Génère des dicts de colonnes dans l'ordre du fichier ; au plus 2 tâches en vol par worker
+    workers = workers or os.cpu_count()
+    model = get_model()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(draws, model)) as pool:
+        inflight = []
+        for X, ids in _tasks(chunks, id_column):
+            inflight.append((pool.submit(_score_task, X, level), X, ids))
+            if len(inflight) >= 2 * workers:
+                yield _collect(inflight.pop(0), model, id_column)
+        for item in inflight:
+            yield _collect(item, model, id_column)
+
+
+def _collect(item, model, id_column):
+    future, X, ids = item
+    mean, low, high = future.result()
+    result = {"proba": model.probability(X), "proba_bootstrap": mean, "low": low, "high": high}
+    if id_column:
+        result = {id_column: ids, **result}
+    return result
+
+
+def main(argv=None):
+    from batch import ResultWriter, read_chunks
+
+    parser = argparse.ArgumentParser(description="Intervalles de confiance par bootstrap paramétrique.")
+    parser.add_argument("input", help="fichier de réponses codées (CSV, Parquet ou JSONL)")
+    parser.add_argument("-o", "--output", required=True, help="fichier de sortie (.csv, .parquet ou .jsonl)")
+    parser.add_argument("--draws", type=int, default=DRAWS, help="nombre de vecteurs de coefficients tirés")
+    parser.add_argument("--level", type=float, default=LEVEL)
+    parser.add_argument("--workers", type=int, help="processus (par défaut : nombre de cœurs)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--id-column", help="colonne identifiant à recopier dans la sortie")
+    args = parser.parse_args(argv)
+
+    try:
+        draws = draw_coefficients(get_model(), args.draws, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+
+    writer = ResultWriter(args.output)
+    n_rows = 0
+    try:
+        for result in bootstrap_intervals(read_chunks(args.input, args.chunksize), draws, args.level,
+                                          args.workers, args.id_column):
+            writer.write(result)
+            n_rows += len(result["proba"])
+    finally:
+        writer.close()
+    print(f"{n_rows} réponses, {args.draws} tirages", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
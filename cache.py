@@ -0,0 +1,153 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import METRICS
+from population import get_distribution, marginals_digest
+from whatif import WHATIF
+
+# --- CACHE DES RÉSULTATS PARTAGÉ ENTRE LES SESSIONS ---
+# Les mêmes combinaisons de réponses reviennent souvent (même type d'emploi, même tranche
+# de revenu, mêmes oui/non) : le résultat d'un profil complet (probabilité, bande,
+# intervalle, percentile, leviers « Et si… » mis en forme) est conservé dans le processus
+# sous une empreinte de 16 octets du modèle et du vecteur encodé. LRU borné à SIZE entrées,
+# chacune valable TTL secondes ; vidé dès que le modèle actif change (rechargement du
+# registre, bandes, recalibration). Taux de succès, taille et évictions sont exposés par
+# les mesures de performance (metrics.py).
+#
+#   BURNOUT_CACHE_SIZE=20000 BURNOUT_CACHE_TTL=86400 streamlit run app.py
+#   BURNOUT_CACHE_SIZE= streamlit run app.py   # désactivé
+
+# Nombre maximal d'entrées ; vide ou 0 : cache désactivé
+SIZE = int(os.environ.get("BURNOUT_CACHE_SIZE", "4096") or 0)
+TTL = float(os.environ.get("BURNOUT_CACHE_TTL", "3600"))
+
+
+def assess(model, log_odds, proba, x=None, idx=None, numeric=None):
+    # Tout ce que le résultat affiché calcule à partir du score. Profil complet (x donné) :
+    # intervalle et leviers « Et si… » en plus ; le résultat est alors mis en cache et
+    # partagé entre les sessions, il ne doit pas être modifié.
+    population = get_distribution(model)
+    levers = [] if x is None else WHATIF.improvements(model, idx, numeric, proba, top=5)
+    return {
+        "proba": proba,
+        "log_odds": log_odds,
+        "band": int(model.band(proba)),
+        # Intervalle de confiance (méthode delta) si la covariance du modèle est disponible
+        "ci": None if x is None else model.interval(x),
+        # Position dans la population de référence (si la distribution a été construite)
+        "percentile": None if population is None else population.percentile(log_odds),
+        "whatif": "\n".join(
+            f"- **{q['name']}** → « {label} » : {alt * 100:.1f} % (−{reduction * 100:.1f} points)"
+            for q, label, alt, reduction in levers
+        ),
+    }
+
+
+class ResultCache:
+
+    def __init__(self, size=SIZE, ttl=TTL):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Empreinte -> (échéance, résultat), du moins au plus récemment utilisé
+        self._entries = OrderedDict()
+        self._model = None
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def fingerprint(model, x):
+        # Les marges de référence entrent dans la clé : le percentile change avec elles
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{model.version}\0{model.digest}\0{marginals_digest()}\0".encode())
+        h.update(x.tobytes())
+        return h.digest()
+
+    def lookup(self, model, x, compute):
+        # Résultat en cache pour ce vecteur encodé, sinon compute() (hors verrou) puis mise en
+        # cache. Le résultat est partagé entre les sessions : il ne doit pas être modifié.
+        if not self.enabled:
+            return compute()
+        key = self.fingerprint(model, x)
+        result = self.get(model, key)
+        if result is None:
+            result = compute()
+            self.put(model, key, result)
+        return result
+
+    def get(self, model, key):
+        expired = False
+        with self._lock:
+            self._check_model(model)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                expired, entry = True, None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        METRICS.count("result_cache", outcome="miss" if entry is None else "hit")
+        if expired:
+            METRICS.count("result_cache", outcome="expiration")
+        return None if entry is None else entry[1]
+
+    def put(self, model, key, result):
+        evicted = 0
+        with self._lock:
+            # Modèle changé pendant le calcul : le résultat n'est pas conservé
+            if model is not self._model:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self.evictions += evicted
+        if evicted:
+            METRICS.count("result_cache", evicted, outcome="eviction")
+
+    def _check_model(self, model):
+        # Appelé sous le verrou. Un autre objet modèle (le registre en crée un à chaque
+        # rechargement) invalide toutes les entrées.
+        if model is self._model:
+            return
+        if self._model is not None:
+            self.invalidations += 1
+            METRICS.count("result_cache", outcome="invalidation")
+        self._entries.clear()
+        self._model = model
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._model = None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else float("nan"),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+CACHE = ResultCache()
+METRICS.gauge("result_cache_entries", lambda: len(CACHE))
@@ -0,0 +1,223 @@
+import argparse
+import datetime
+import json
+import os
+import sys
+
+import numpy as np
+
+from model import BANDS_FILE, BANDS_PATH, get_model
+from questions import ENCODER
+
+# --- CALIBRATION DES SEUILS ET DES BANDES DE RISQUE ---
+# Score un fichier de validation étiqueté avec le modèle actif, calcule les courbes
+# ROC / précision-rappel pour tous les seuils à la fois (un seul tri, puis sommes
+# cumulées), ajuste une recalibration (Platt ou isotonique) et écrit la configuration
+# des bandes chargée par l'application (bands.json à côté de l'artefact du modèle).
+#
+#   python calibrate.py validation.parquet --label burnout --recall 0.8 --high-precision 0.5
+#   -> artifacts/models/<version>/bands.json  (ou artifacts/bands_logit1.json)
+
+LABEL = "burnout"
+RECALL = 0.80
+HIGH_PRECISION = 0.50
+ISOTONIC_BINS = 1000
+PLATT_ITER = 25
+CURVE_POINTS = 2000
+
+
+def load_scores(chunks, model, label=LABEL):
+    # Log-odds bruts (avant toute recalibration) et étiquettes, lignes incomplètes écartées
+    scores, labels = [], []
+    for df in chunks:
+        X = ENCODER.encode(ENCODER.frame_indices(df), ENCODER.frame_numeric(df))
+        y = df[label].to_numpy(dtype=np.float64, na_value=np.nan)
+        L = model.log_odds(X)
+        keep = ~(np.isnan(L) | np.isnan(y))
+        scores.append(L[keep])
+        labels.append(y[keep] > 0.5)
+    return np.concatenate(scores), np.concatenate(labels)
+
+
+def sort_scores(scores, labels):
+    # L'unique tri O(n log n) : scores décroissants. Les recalibrations étant monotones,
+    # cet ordre reste valable pour les probabilités recalibrées.
+    order = np.argsort(scores, kind="stable")[::-1]
+    return scores[order], labels[order]
+
+
+def curves(proba, labels):
+    # proba triées par ordre décroissant. Pour chaque seuil distinct t (réponses signalées : proba >= t),
+    # vrais et faux positifs par sommes cumulées : toutes les courbes en O(n)
+    n = len(proba)
+    tp = np.cumsum(labels, dtype=np.int64)
+    fp = np.arange(1, n + 1, dtype=np.int64) - tp
+    last = np.append(np.flatnonzero(proba[1:] != proba[:-1]), n - 1)
+    tp, fp = tp[last], fp[last]
+    positives, negatives = tp[-1], fp[-1]
+    return {
+        "threshold": proba[last],
+        "recall": tp / max(positives, 1),
+        "fpr": fp / max(negatives, 1),
+        "precision": tp / (tp + fp),
+        "flagged": (tp + fp) / n,
+    }
+
+
+def auc(curve):
+    fpr = np.concatenate([[0.0], curve["fpr"]])
+    tpr = np.concatenate([[0.0], curve["recall"]])
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+
+def average_precision(curve):
+    return float(np.sum(np.diff(curve["recall"], prepend=0.0) * curve["precision"]))
+
+
+def at(curve, threshold):
+    # Point de la courbe pour la règle « proba >= threshold »
+    i = np.searchsorted(-curve["threshold"], -threshold, side="right") - 1
+    if i < 0:
+        return {"threshold": float(threshold), "recall": 0.0, "precision": float("nan"), "flagged": 0.0}
+    return {"threshold": float(threshold), **{k: float(curve[k][i]) for k in ("recall", "precision", "flagged")}}
+
+
+def fit_platt(scores, labels, max_iter=PLATT_ITER, tol=1e-10):
+    # Régression logistique à deux paramètres sur les log-odds : p = sigmoïde(a * L + b)
+    a, b = 1.0, 0.0
+    y = labels.astype(np.float64)
+    for _ in range(max_iter):
+        p = 1 / (1 + np.exp(-(a * scores + b)))
+        r = y - p
+        w = p * (1 - p)
+        wL = w * scores
+        H = np.array([[np.dot(wL, scores), wL.sum()], [wL.sum(), w.sum()]])
+        step = np.linalg.solve(H, [np.dot(r, scores), r.sum()])
+        a, b = a + step[0], b + step[1]
+        if np.abs(step).max() < tol:
+            break
+    return {"method": "platt", "a": float(a), "b": float(b)}
+
+
+def fit_isotonic(scores_desc, labels_desc, bins=ISOTONIC_BINS):
+    # Régression isotonique (pool-adjacent-violators) sur des blocs d'effectifs égaux des
+    # scores triés : la boucle porte sur quelques centaines de blocs, pas sur les n lignes
+    proba = 1 / (1 + np.exp(-scores_desc[::-1]))
+    y = labels_desc[::-1].astype(np.float64)
+    starts = np.unique(np.linspace(0, len(proba), bins + 1).astype(np.int64)[:-1])
+    counts = np.diff(np.append(starts, len(proba)))
+    x = np.add.reduceat(proba, starts) / counts
+    rate = np.add.reduceat(y, starts) / counts
+
+    values, weights, sizes = [], [], []
+    for v, w in zip(rate.tolist(), counts.tolist()):
+        values.append(v)
+        weights.append(w)
+        sizes.append(1)
+        while len(values) > 1 and values[-2] > values[-1]:
+            v, w, s = values.pop(), weights.pop(), sizes.pop()
+            values[-1] = (values[-1] * weights[-1] + v * w) / (weights[-1] + w)
+            weights[-1] += w
+            sizes[-1] += s
+    fitted = np.repeat(values, sizes)
+    # Nœuds d'abscisses strictement croissantes pour np.interp
+    x, first = np.unique(x, return_index=True)
+    return {"method": "isotonic", "x": x.tolist(), "y": fitted[first].tolist()}
+
+
+def choose_thresholds(curve, recall=RECALL, high_precision=HIGH_PRECISION):
+    # Seuil de classification : le plus haut qui atteint le rappel visé.
+    # Seuil « très élevé » : le plus bas, au-dessus, dont la précision atteint la cible.
+    i = int(np.argmax(curve["recall"] >= recall))
+    low = float(curve["threshold"][i])
+    candidates = np.flatnonzero((curve["precision"][:i] >= high_precision))
+    if len(candidates) == 0:
+        raise ValueError(f"aucun seuil au-dessus de {low:.3f} n'atteint une précision de {high_precision:.0%}")
+    return low, float(curve["threshold"][candidates[-1]])
+
+
+def _losses(proba, labels):
+    p = np.clip(proba, 1e-12, 1 - 1e-12)
+    return {
+        "brier": float(np.mean((p - labels) ** 2)),
+        "log_loss": float(-np.mean(np.where(labels, np.log(p), np.log1p(-p)))),
+    }
+
+
+def main(argv=None):
+    from batch import read_chunks
+    from registry import REGISTRY
+
+    parser = argparse.ArgumentParser(description="Calibre les seuils et les bandes de risque sur un fichier de validation étiqueté.")
+    parser.add_argument("input", help="fichier de réponses codées avec la variable cible (CSV, Parquet ou JSONL)")
+    parser.add_argument("--label", default=LABEL, help="colonne cible (0/1)")
+    parser.add_argument("--method", choices=("platt", "isotonic", "none"), default="platt", help="recalibration des probabilités")
+    parser.add_argument("--recall", type=float, default=RECALL, help="rappel visé au seuil de classification")
+    parser.add_argument("--high-precision", type=float, default=HIGH_PRECISION, help="précision visée pour la bande « très élevé »")
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    parser.add_argument("--curves", help="écrit aussi les courbes (CSV, au plus ~2000 points)")
+    parser.add_argument("-o", "--output", help="configuration des bandes (par défaut, à côté de l'artefact actif)")
+    args = parser.parse_args(argv)
+
+    def log(msg):
+        print(msg, file=sys.stderr)
+
+    model = get_model()
+    scores, labels = sort_scores(*load_scores(read_chunks(args.input, args.chunksize), model, args.label))
+    log(f"{len(scores)} réponses étiquetées, {int(labels.sum())} positives (modèle {model.version})")
+
+    raw = 1 / (1 + np.exp(-scores))
+    if args.method == "platt":
+        calibration = fit_platt(scores, labels)
+    elif args.method == "isotonic":
+        calibration = fit_isotonic(scores, labels)
+    else:
+        calibration = None
+    calibrated = model.recalibrated(model.thresholds, calibration).calibrate(scores)
+
+    curve = curves(calibrated, labels)
+    low, high = choose_thresholds(curve, args.recall, args.high_precision)
+    raw_curve = curves(raw, labels)
+    metrics = {
+        "n": int(len(scores)),
+        "prevalence": float(labels.mean()),
+        "auc": auc(curve),
+        "average_precision": average_precision(curve),
+        "raw": _losses(raw, labels),
+        "calibrated": _losses(calibrated, labels),
+        "previous": [at(raw_curve, t) for t in model.thresholds.tolist()] if model.calibration is None else None,
+        "bands": [at(curve, low), at(curve, high)],
+    }
+    for name, point in (("classification", metrics["bands"][0]), ("très élevé", metrics["bands"][1])):
+        log(f"Seuil {name} {point['threshold']:.4f} : rappel {point['recall']:.3f}, "
+            f"précision {point['precision']:.3f}, {point['flagged']:.1%} signalés")
+    log(f"AUC {metrics['auc']:.4f}, Brier {metrics['raw']['brier']:.5f} -> {metrics['calibrated']['brier']:.5f}")
+
+    config = {
+        "model_version": model.version,
+        "model_digest": model.digest,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "source": os.path.basename(args.input),
+        "thresholds": [low, high],
+        "calibration": calibration,
+        "metrics": metrics,
+    }
+    path = REGISTRY.active_path()
+    output = args.output or (BANDS_PATH if path is None else os.path.join(path, BANDS_FILE))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    # Écriture atomique : le registre recharge la configuration à chaud
+    tmp = f"{output}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, output)
+    log(f"-> {output}")
+
+    if args.curves:
+        import pandas as pd
+
+        step = max(1, len(curve["threshold"]) // CURVE_POINTS)
+        pd.DataFrame({k: v[::step] for k, v in curve.items()}).to_csv(args.curves, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import numpy as np
+
+from population import load_marginals, numeric_weights, option_weights
+from questions import ENCODER
+
+# --- CONTRIBUTIONS PAR FACTEUR ---
+# Le modèle est linéaire en log-odds : log_odds(x) = log_odds(réf) + Σ coef_j (x_j − réf_j).
+# La contribution d'une question est la somme de ces termes sur ses colonnes (les
+# indicatrices de revenu forment un seul facteur). Pour une matrice de profils, c'est un
+# produit colonne par colonne suivi d'un seul produit matriciel de regroupement.
+
+
+def factor_groups(model):
+    # Questions du modèle et colonnes correspondantes
+    return [(q, [model.column_index[c] for c in q["columns"]])
+            for q in ENCODER.categorical + ENCODER.numeric if q["columns"]]
+
+
+def group_matrix(model):
+    # (variables, facteurs) : 1 si la variable appartient au facteur
+    groups = factor_groups(model)
+    G = np.zeros((len(model.features), len(groups)))
+    for g, (_, cols) in enumerate(groups):
+        G[cols, g] = 1
+    return G
+
+
+def favourable_reference(model):
+    # Valeur de chaque variable la plus favorable (coef × valeur minimal) parmi les options proposées
+    ref = np.empty(len(model.features))
+    for i, q in enumerate(ENCODER.categorical):
+        rows = ENCODER.table[ENCODER.offsets[i]:ENCODER.offsets[i] + ENCODER.n_options[i]]
+        for c in q["columns"]:
+            j = model.column_index[c]
+            values = rows[~np.isnan(rows[:, j]), j]
+            ref[j] = values[np.argmin(model.coef[j] * values)]
+    for q in ENCODER.numeric:
+        j = model.column_index[q["columns"][0]]
+        ref[j] = q["min"] if model.coef[j] > 0 else q["max"]
+    return ref
+
+
+def population_reference(model, marginals):
+    # Profil moyen de la population de référence, pondéré par les fréquences de réponse
+    ref = np.empty(len(model.features))
+    for i, w in enumerate(option_weights(marginals)):
+        cols = ENCODER.cat_cols[ENCODER.cat_owner == i]
+        rows = ENCODER.table[ENCODER.offsets[i]:ENCODER.offsets[i] + ENCODER.n_options[i]]
+        keep = w > 0
+        ref[cols] = w[keep] @ rows[keep][:, cols]
+    for col, (values, w) in zip(ENCODER.numeric_cols, numeric_weights(marginals)):
+        ref[col] = values @ w
+    return ref
+
+
+def reference_profile(model, marginals=None):
+    # Profil moyen de la population si les fréquences de réponse sont disponibles,
+    # sinon profil le plus favorable. Renvoie (profil, libellé).
+    marginals = load_marginals() if marginals is None else marginals
+    if marginals is None:
+        return favourable_reference(model), "Profil le plus favorable"
+    return population_reference(model, marginals), "Profil moyen de la population"
+
+
+def contributions(model, X, reference, G=None):
+    # X : vecteur encodé ou matrice (n, variables) -> contributions (..., facteurs) en log-odds
+    G = group_matrix(model) if G is None else G
+    return ((X - reference) * model.coef) @ G
+
+
+def waterfall(model, x, reference, limit=0.01):
+    # Étapes d'une cascade triée : des plus fortes hausses aux plus fortes baisses, les facteurs
+    # de moins de `limit` log-odds regroupés à la fin. Renvoie (log-odds de référence, étapes).
+    c = contributions(model, x, reference)
+    names = [q["name"] for q, _ in factor_groups(model)]
+    level = model.intercept + float(reference @ model.coef)
+    start, steps = level, []
+    order = np.argsort(-c)
+    for g in order[np.abs(c[order]) >= limit]:
+        steps.append((names[g], level, level + float(c[g])))
+        level += float(c[g])
+    rest = float(c[np.abs(c) < limit].sum())
+    if rest:
+        steps.append(("Autres facteurs", level, level + rest))
+    return start, steps
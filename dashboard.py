@@ -0,0 +1,95 @@
+import hashlib
+
+import numpy as np
+
+from batch import CHUNKSIZE, read_chunks
+from contributions import contributions, factor_groups, favourable_reference, group_matrix
+from questions import ENCODER
+
+# --- AGRÉGATS D'ÉQUIPE POUR LE TABLEAU DE BORD ---
+# Un export de réponses est lu par blocs ; chaque bloc est encodé, scoré et versé dans
+# des agrégats cumulés, ventilés par cellule de filtre (genre × diplôme × type d'emploi ×
+# tranche d'âge). Filtrer revient ensuite à sommer des cellules : aucun re-scoring.
+# Les agrégats ne contiennent que des effectifs et des sommes, jamais de ligne individuelle.
+
+FILTERS = ("genre", "diplome", "type_emploi")
+AGE_EDGES = np.array([25, 35, 45, 55])
+AGE_GROUPS = ["< 25 ans", "25–34 ans", "35–44 ans", "45–54 ans", "55 ans et +", "Âge non renseigné"]
+BINS = 50
+AGE = next((j for j, q in enumerate(ENCODER.numeric) if q["columns"] == ["AGE"]), None)
+# En dessous de cet effectif, une sélection n'est pas affichée (anonymat des équipes)
+MIN_GROUP = 5
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class TeamAggregate:
+
+    def __init__(self, model):
+        self.model_version = model.version
+        # Contributions par facteur : modèle logistique seulement
+        self.linear = model.linear
+        self.thresholds = model.thresholds.tolist()
+        self.filter_pos = [ENCODER.position[k] for k in FILTERS]
+        self.filter_options = [list(ENCODER.option_index[p]) + ["Non renseigné"] for p in self.filter_pos]
+        self.shape = tuple(len(o) for o in self.filter_options) + (len(AGE_GROUPS),)
+        n_cells = int(np.prod(self.shape))
+        self.factors = [q["name"] for q, _ in factor_groups(model)]
+        # Facteurs liés à l'organisation du travail (questions « modifiables »), sur lesquels une équipe peut agir
+        self.actionable = np.array([q.get("modifiable", False) for q, _ in factor_groups(model)])
+        self.hist = np.zeros((n_cells, BINS), dtype=np.int64)
+        self.bands = np.zeros((n_cells, len(self.thresholds) + 1), dtype=np.int64)
+        self.contrib = np.zeros((n_cells, len(self.factors)))
+        self.incomplete = np.zeros(n_cells, dtype=np.int64)
+        self.rows = 0
+
+    def add(self, model, idx, numeric, reference, G):
+        X = ENCODER.encode(idx, numeric)
+        proba = model.probability(X)
+        complete = ~np.isnan(proba)
+        age = numeric[:, AGE] if AGE is not None else np.full(len(idx), np.nan)
+        age_group = np.where(np.isnan(age), len(AGE_GROUPS) - 1, np.searchsorted(AGE_EDGES, age, side="right"))
+        cell = np.ravel_multi_index(tuple(idx[:, p] for p in self.filter_pos) + (age_group,), self.shape)
+
+        n_cells = len(self.incomplete)
+        self.incomplete += np.bincount(cell[~complete], minlength=n_cells)
+        cell, proba, X = cell[complete], proba[complete], X[complete]
+        b = np.minimum((proba * BINS).astype(np.intp), BINS - 1)
+        self.hist += np.bincount(cell * BINS + b, minlength=n_cells * BINS).reshape(n_cells, BINS)
+        band = model.band(proba)
+        k = self.bands.shape[1]
+        self.bands += np.bincount(cell * k + band, minlength=n_cells * k).reshape(n_cells, k)
+        # Excès de log-odds par facteur par rapport à la réponse la plus favorable, sommé par cellule
+        if self.linear:
+            np.add.at(self.contrib, cell, contributions(model, X, reference, G))
+        self.rows += len(idx)
+
+    def select(self, selection):
+        # selection : un masque booléen par dimension de filtre (âge compris) -> cellules retenues
+        mask = np.ix_(*selection)
+
+        def total(a):
+            return a.reshape(self.shape + a.shape[1:])[mask].reshape((-1,) + a.shape[1:]).sum(axis=0)
+
+        return {
+            "hist": total(self.hist),
+            "bands": total(self.bands),
+            "contrib": total(self.contrib),
+            "incomplete": int(total(self.incomplete)),
+        }
+
+
+def aggregate(source, model, fmt=None, chunksize=CHUNKSIZE):
+    # source : chemin ou fichier ouvert ; agrégats cumulés bloc par bloc, mémoire constante
+    agg = TeamAggregate(model)
+    reference = favourable_reference(model) if model.linear else None
+    G = group_matrix(model)
+    idx = np.empty((chunksize, len(ENCODER.categorical)), dtype=np.intp)
+    numeric = np.empty((chunksize, len(ENCODER.numeric)), dtype=np.float64)
+    for df in read_chunks(source, chunksize, fmt):
+        for start in range(0, len(df), chunksize):
+            part = df.iloc[start:start + chunksize]
+            agg.add(model, ENCODER.frame_indices(part, idx), ENCODER.frame_numeric(part, numeric), reference, G)
+    return agg
@@ -0,0 +1,72 @@
+import numpy as np
+
+from population import load_marginals, option_weights
+from questions import ENCODER
+
+# --- RISQUE ATTENDU EN PRÉSENCE DE RÉPONSES MANQUANTES ---
+# Les réponses manquantes (« Je ne sais pas », « Sans objet »…) sont remplacées par
+# toutes leurs valeurs possibles, pondérées par les fréquences de réponse de la
+# population de référence. Énumération exacte quand le nombre de combinaisons est
+# petit, tirage Monte Carlo vectorisé sinon : le coût reste borné par
+# max(EXACT_LIMIT, SAMPLES) profils quel que soit le nombre de questions sautées.
+
+EXACT_LIMIT = 4096
+SAMPLES = 4096
+LEVEL = 0.90
+
+
+def _weighted_interval(values, weights, level):
+    order = np.argsort(values)
+    cum = np.cumsum(weights[order])
+    cum /= cum[-1]
+    lo, hi = np.searchsorted(cum, [(1 - level) / 2, (1 + level) / 2])
+    return float(values[order][min(lo, len(cum) - 1)]), float(values[order][min(hi, len(cum) - 1)])
+
+
+def expected_risk(model, idx, numeric, marginals=None, level=LEVEL, seed=0):
+    # Renvoie None si aucune fréquence de référence n'est disponible
+    marginals = marginals if marginals is not None else load_marginals()
+    if marginals is None:
+        return None
+    weights = option_weights(marginals)
+
+    missing = np.flatnonzero(ENCODER.missing[ENCODER.offsets + idx])
+    candidates = [np.flatnonzero(weights[i]) for i in missing]
+    probs = [weights[i][c] for i, c in zip(missing, candidates)]
+    combinations = int(np.prod([len(c) for c in candidates], dtype=np.float64))
+
+    if combinations <= EXACT_LIMIT:
+        # Produit cartésien des options possibles, chaque profil pondéré par le produit des fréquences
+        grid = np.indices([len(c) for c in candidates]).reshape(len(candidates), combinations).T
+        rows = np.repeat(idx[None, :], len(grid), axis=0)
+        w = np.ones(len(grid))
+        for j, i in enumerate(missing):
+            rows[:, i] = candidates[j][grid[:, j]]
+            w *= probs[j][grid[:, j]]
+        method = "exacte"
+    else:
+        # Tirage par inversion de la fonction de répartition, une colonne par question manquante
+        rng = np.random.default_rng(seed)
+        rows = np.repeat(idx[None, :], SAMPLES, axis=0)
+        u = rng.random((SAMPLES, len(missing)))
+        for j, i in enumerate(missing):
+            cdf = np.cumsum(probs[j])
+            rows[:, i] = candidates[j][np.minimum(np.searchsorted(cdf, u[:, j] * cdf[-1]), len(cdf) - 1)]
+        w = np.ones(SAMPLES)
+        method = "monte_carlo"
+
+    X = ENCODER.encode(rows, np.broadcast_to(numeric, (len(rows), len(numeric))))
+    log_odds = model.log_odds(X)
+    proba = model.calibrate(log_odds)
+    low, high = _weighted_interval(proba, w, level)
+    return {
+        "expected": float(np.average(proba, weights=w)),
+        # Log-odds brut moyen (avant recalibration) : même échelle que la distribution de référence
+        "log_odds": float(np.average(log_odds, weights=w)),
+        "low": low,
+        "high": high,
+        "level": level,
+        "method": method,
+        "profiles": len(rows),
+        "missing": [ENCODER.categorical[i] for i in missing]
+    }
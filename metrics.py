@@ -0,0 +1,286 @@
+import argparse
+import atexit
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- MESURES DE PERFORMANCE PAR PHASE ---
+# Durées des phases d'un rerun (rendu des widgets, encodage, scoring, résultat, conseils…)
+# agrégées en histogrammes dans le processus, et compteurs (reruns, soumissions, bandes,
+# refus pour réponses manquantes). Exposés au format texte Prometheus sur un port local
+# (BURNOUT_METRICS_PORT) et/ou ajoutés périodiquement à un fichier JSONL
+# (BURNOUT_METRICS_JSONL) pour l'analyse hors ligne. Désactivé par défaut : une mesure
+# ne coûte alors qu'un appel de méthode renvoyant un contexte vide partagé.
+#
+#   BURNOUT_METRICS_PORT=9108 streamlit run app.py
+#   curl -s localhost:9108/metrics
+#   python metrics.py summary metrics.jsonl
+
+logger = logging.getLogger("burnout.metrics")
+
+PORT = os.environ.get("BURNOUT_METRICS_PORT", "")
+JSONL_PATH = os.environ.get("BURNOUT_METRICS_JSONL", "")
+DUMP_INTERVAL = 60.0
+PREFIX = "burnout"
+# Bornes des histogrammes (secondes), de 100 µs à 5 s
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _NoSpan:
+    # Contexte et chronomètre vides partagés, renvoyés quand les mesures sont désactivées
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def lap(self, phase):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "phase", "start")
+
+    def __init__(self, metrics, phase):
+        self.metrics = metrics
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.phase, time.perf_counter() - self.start)
+        return False
+
+
+class _Stopwatch:
+    # Phases successives d'un même rerun : chaque tour enregistre le temps écoulé depuis le précédent
+    __slots__ = ("metrics", "last")
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.metrics.observe(phase, now - self.last)
+        self.last = now
+
+
+class Metrics:
+
+    def __init__(self, port=PORT, jsonl_path=JSONL_PATH, dump_interval=DUMP_INTERVAL, buckets=BUCKETS):
+        self.port = int(port) if port else None
+        self.jsonl_path = jsonl_path or None
+        self.enabled = self.port is not None or self.jsonl_path is not None
+        self.dump_interval = dump_interval
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._started = False
+        # Par phase : [effectifs par intervalle (dernier : au-delà de la borne max), somme, nombre]
+        self.histograms = {}
+        # Par (nom, étiquettes triées) : valeur
+        self.counters = {}
+        # Par nom : fonction lue à chaque export (taille d'un cache…)
+        self.gauges = {}
+
+    def span(self, phase):
+        # with METRICS.span("score"): ... ; rien n'est mesuré si les mesures sont désactivées
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, phase)
+
+    def stopwatch(self):
+        # clock = METRICS.stopwatch() ; ... ; clock.lap("widgets") ; ... ; clock.lap("score")
+        if not self.enabled:
+            return _NO_SPAN
+        return _Stopwatch(self)
+
+    def observe(self, phase, seconds):
+        if not self._started:
+            self._start()
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            h = self.histograms.get(phase)
+            if h is None:
+                h = self.histograms[phase] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            h[0][i] += 1
+            h[1] += seconds
+            h[2] += 1
+
+    def count(self, name, n=1, **labels):
+        if not self.enabled:
+            return
+        if not self._started:
+            self._start()
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def gauge(self, name, read):
+        # Valeur instantanée, lue seulement à l'export : aucun coût sur le chemin d'un rerun
+        self.gauges[name] = read
+
+    def _start(self):
+        # Serveur HTTP et/ou thread d'écriture lancés à la première mesure
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        if self.port is not None:
+            try:
+                server = ThreadingHTTPServer(("127.0.0.1", self.port), _handler(self))
+            except OSError as e:
+                logger.warning("Port %d indisponible pour les mesures : %s", self.port, e)
+            else:
+                threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+                logger.info("Mesures exposées sur http://127.0.0.1:%d/metrics", self.port)
+        if self.jsonl_path is not None:
+            threading.Thread(target=self._run, name="metrics-dump", daemon=True).start()
+            atexit.register(self.dump)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "ts": time.time(),
+                "pid": os.getpid(),
+                "buckets": list(self.buckets),
+                "phases": {p: {"counts": list(h[0]), "sum": h[1], "count": h[2]} for p, h in self.histograms.items()},
+                "counters": [{"name": name, "labels": dict(labels), "value": v}
+                             for (name, labels), v in self.counters.items()],
+                "gauges": {name: read() for name, read in self.gauges.items()},
+            }
+
+    def dump(self):
+        # Ajoute l'état cumulé courant (une ligne) au fichier JSONL
+        line = json.dumps(self.snapshot(), ensure_ascii=False)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.jsonl_path)), exist_ok=True)
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.warning("Écriture des mesures impossible (%s) : %s", self.jsonl_path, e)
+
+    def _run(self):
+        while True:
+            time.sleep(self.dump_interval)
+            self.dump()
+
+    def prometheus(self):
+        # Format d'exposition texte de Prometheus (histogrammes cumulatifs, compteurs *_total)
+        snap = self.snapshot()
+        lines = [f"# HELP {PREFIX}_phase_seconds Durée des phases d'un rerun",
+                 f"# TYPE {PREFIX}_phase_seconds histogram"]
+        for phase, h in sorted(snap["phases"].items()):
+            cumulative = 0
+            for bound, c in zip(list(self.buckets) + ["+Inf"], h["counts"]):
+                cumulative += c
+                lines.append(f'{PREFIX}_phase_seconds_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}_phase_seconds_sum{{phase="{phase}"}} {h["sum"]:.9f}')
+            lines.append(f'{PREFIX}_phase_seconds_count{{phase="{phase}"}} {h["count"]}')
+        seen = set()
+        for c in sorted(snap["counters"], key=lambda c: (c["name"], sorted(c["labels"].items()))):
+            name = f"{PREFIX}_{c['name']}_total"
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {name} counter")
+            labels = ",".join(f'{k}="{v}"' for k, v in sorted(c["labels"].items()))
+            lines.append(f"{name}{{{labels}}} {c['value']}" if labels else f"{name} {c['value']}")
+        for name, value in sorted(snap["gauges"].items()):
+            lines.append(f"# TYPE {PREFIX}_{name} gauge")
+            lines.append(f"{PREFIX}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _handler(metrics):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def quantile(buckets, counts, q):
+    # Quantile approché d'un histogramme : interpolation linéaire dans l'intervalle concerné
+    total = sum(counts)
+    if not total:
+        return float("nan")
+    rank, cumulative = q * total, 0
+    edges = [0.0] + list(buckets)
+    for i, c in enumerate(counts):
+        if cumulative + c >= rank and c:
+            if i == len(buckets):
+                return edges[-1]
+            return edges[i] + (edges[i + 1] - edges[i]) * (rank - cumulative) / c
+        cumulative += c
+    return edges[-1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Résumé des mesures de performance (fichier JSONL).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("summary", help="quantiles par phase et compteurs (dernier état de chaque processus)")
+    p.add_argument("path", nargs="?", default=JSONL_PATH or None)
+    args = parser.parse_args(argv)
+    if not args.path:
+        parser.error("indiquez le fichier JSONL (ou BURNOUT_METRICS_JSONL)")
+
+    # Chaque ligne est un état cumulé : on garde la dernière par processus, puis on somme
+    latest = {}
+    with open(args.path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                snap = json.loads(line)
+                latest[snap["pid"]] = snap
+    phases, counters, gauges, buckets = {}, {}, {}, None
+    for snap in latest.values():
+        buckets = snap["buckets"]
+        for phase, h in snap["phases"].items():
+            acc = phases.setdefault(phase, {"counts": [0] * len(h["counts"]), "sum": 0.0, "count": 0})
+            acc["counts"] = [a + b for a, b in zip(acc["counts"], h["counts"])]
+            acc["sum"] += h["sum"]
+            acc["count"] += h["count"]
+        for c in snap["counters"]:
+            key = (c["name"], tuple(sorted(c["labels"].items())))
+            counters[key] = counters.get(key, 0) + c["value"]
+        for name, value in snap.get("gauges", {}).items():
+            gauges[name] = gauges.get(name, 0) + value
+
+    print(f"{'phase':<12} {'n':>8} {'moy. ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for phase, h in sorted(phases.items(), key=lambda item: -item[1]["sum"]):
+        q = [quantile(buckets, h["counts"], x) * 1000 for x in (0.5, 0.95, 0.99)]
+        print(f"{phase:<12} {h['count']:>8} {h['sum'] / h['count'] * 1000:>9.2f} {q[0]:>8.2f} {q[1]:>8.2f} {q[2]:>8.2f}")
+    print()
+    for (name, labels), v in sorted(counters.items()):
+        label = ",".join(f"{k}={val}" for k, val in labels)
+        print(f"{name + (f' [{label}]' if label else ''):<32} {v:>10}")
+    for name, value in sorted(gauges.items()):
+        print(f"{name:<32} {value:>10}")
+
+
+METRICS = Metrics()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+import hashlib
+import json
+import math
+import os
+import threading
+from statistics import NormalDist
+from types import MappingProxyType
+
+import numpy as np
+
+# --- MODÈLE LOGIT1 (CT-RPS 2016) ---
+
+# Coefficients estimés du modèle logit1
+COEFFICIENTS = {
+    "const": -3.3687,
+    "TENSION2_reg": 0.6319,
+    "INITIAT_reg": 0.5121,
+    "JOINEXT_reg": 0.6286,
+    "RPB5E_b": 0.7328,
+    "RPB1J_b": 0.7206,
+    "ACCHEF_reg": 0.2619,
+    "RP4B_reg": 0.3798,
+    "sexe": 0.7848,
+    "RPB1E_b": 0.8432,
+    "CVFVP_reg": -0.7198,
+    "RP1_reg": -0.6660,
+    "BIENETR1_reg": -0.4299,
+    "niv_diplome_reg": 0.1484,
+    "IDEE_reg": -0.2672,
+    "QUANTI_reg": -0.2745,
+    "AIDCOLL_reg": -0.2803,
+    "INFOCONF_reg": -0.1177,
+    "revmensc_tranche_> 3000": -0.4194,
+    "PREVIS": 0.1115,
+    "TYPEMPLOI": 0.2261,
+    "revmensc_tranche_2251–3000": -0.1733,
+    "revmensc_tranche_1351–1700": -0.0993,
+    "revmensc_tranche_1701–2250": -0.0826,
+    "AGE": 0.0022
+}
+
+# Variables explicatives, dans l'ordre des colonnes de la matrice d'entrée
+FEATURES = [v for v in COEFFICIENTS if v != "const"]
+
+# Seuil de classification (choisi pour maximiser le rappel) et seuil de risque très élevé
+THRESHOLD = 0.2
+HIGH_THRESHOLD = 0.4
+
+# Bandes de risque : 0 = faible, 1 = modéré, 2 = très élevé
+BANDS = np.array(["faible", "modere", "tres_eleve"])
+
+# Répertoire des artefacts calculés hors ligne (distributions de référence, modèles versionnés, etc.)
+ARTIFACTS_DIR = os.environ.get("BURNOUT_ARTIFACTS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts"))
+MODELS_DIR = os.path.join(ARTIFACTS_DIR, "models")
+# Configuration des bandes calibrées, à côté de model.json dans chaque version
+BANDS_FILE = "bands.json"
+# Ensemble d'arbres exporté en JSON, à côté de model.json pour les versions de ce type
+ENSEMBLE_FILE = "ensemble.json"
+# Lignes × arbres évalués à la fois par l'évaluateur d'arbres (mémoire des indices de nœuds)
+TREE_BLOCK = 1 << 20
+
+
+# --- BACKENDS DE SCORING ---
+# Un backend transforme la matrice encodée en log-odds ; BurnoutModel y ajoute seuils,
+# recalibration et intervalle de confiance. Seul le backend logistique est linéaire : les
+# contributions par facteur, la distribution de référence et l'intervalle n'existent que
+# pour lui. Le champ "backend" de model.json choisit l'implémentation (BACKENDS).
+
+
+class LogisticBackend:
+    kind = "logit"
+    linear = True
+
+    def __init__(self, coefficients):
+        self.features = tuple(v for v in coefficients if v != "const")
+        self.intercept = float(coefficients["const"])
+        self.coef = _frozen([coefficients[v] for v in self.features])
+
+    @classmethod
+    def from_artifact(cls, path, meta):
+        return cls(meta["coefficients"])
+
+    def fingerprint(self):
+        return self.coef.tobytes() + np.float64(self.intercept).tobytes()
+
+    def log_odds(self, X):
+        # X : matrice (n, len(features)) ou vecteur (len(features),)
+        return X @ self.coef + self.intercept
+
+    def log_odds_one(self, x):
+        return float(np.dot(x, self.coef)) + self.intercept
+
+
+class TreeEnsembleBackend:
+    # Ensemble d'arbres de décision (gradient boosting) dont la somme des feuilles donne les
+    # log-odds. Les arbres sont compilés en tableaux plats de nœuds : variable, seuil, enfants
+    # (gauche en 2i, droite en 2i + 1) et valeur de feuille. Une feuille pointe sur elle-même,
+    # avec un seuil infini : tous les arbres d'un lot descendent d'un niveau à la fois, sans
+    # branchement, en max_depth étapes de quelques gathers.
+    #
+    # Format d'export (nœuds au format JSON de XGBoost, get_dump(dump_format="json")) :
+    #   {"features": [...], "base_margin": -1.2,
+    #    "trees": [{"nodeid": 0, "split": "TENSION2_reg", "split_condition": 0.5, "yes": 1, "no": 2,
+    #               "children": [{"nodeid": 1, "leaf": -0.12}, {"nodeid": 2, "leaf": 0.3}]}, ...]}
+    # "yes" si x < split_condition. base_margin est en log-odds. Une réponse manquante (NaN)
+    # donne un score manquant, comme pour le modèle logistique.
+    kind = "tree_ensemble"
+    linear = False
+
+    def __init__(self, dump):
+        self.features = tuple(dump["features"])
+        self.base_margin = float(dump.get("base_margin", 0.0))
+        index = {v: j for j, v in enumerate(self.features)}
+        feature, threshold, children, value, roots = [], [], [], [], []
+        depth = 0
+        for tree in dump["trees"]:
+            roots.append(len(feature))
+            # Parcours en profondeur : nœuds numérotés à la volée, enfants reliés après coup
+            stack = [(tree, None, 0)]
+            while stack:
+                node, slot, level = stack.pop()
+                i = len(feature)
+                if slot is not None:
+                    children[slot] = i
+                depth = max(depth, level)
+                if "leaf" in node:
+                    feature.append(0)
+                    threshold.append(np.inf)
+                    children.extend([i, i])
+                    value.append(float(node["leaf"]))
+                    continue
+                split = node["split"]
+                j = index[split] if split in index else int(split[1:]) if split[1:].isdigit() else None
+                if j is None or not 0 <= j < len(self.features):
+                    raise ValueError(f"Variable inconnue dans l'ensemble d'arbres : {split!r}")
+                by_id = {child["nodeid"]: child for child in node["children"]}
+                feature.append(j)
+                threshold.append(float(node["split_condition"]))
+                children.extend([None, None])
+                value.append(0.0)
+                stack.append((by_id[node["no"]], 2 * i + 1, level + 1))
+                stack.append((by_id[node["yes"]], 2 * i, level + 1))
+        if not roots:
+            raise ValueError("Ensemble d'arbres vide")
+        self.feature = _frozen(feature, np.intp)
+        self.threshold = _frozen(threshold)
+        self.children = _frozen(children, np.intp)
+        self.value = _frozen(value)
+        self.roots = _frozen(roots, np.intp)
+        self.depth = depth
+
+    @classmethod
+    def from_artifact(cls, path, meta):
+        with open(os.path.join(path, meta.get("ensemble", ENSEMBLE_FILE)), encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def fingerprint(self):
+        return b"".join(a.tobytes() for a in (self.feature, self.threshold, self.children, self.value, self.roots)) \
+            + np.float64(self.base_margin).tobytes()
+
+    def _descend(self, flat, rows, node):
+        # Un niveau par itération : enfant droit (2i + 1) si x >= seuil, sinon gauche (2i)
+        for _ in range(self.depth):
+            node = self.children[2 * node + (flat[rows + self.feature[node]] >= self.threshold[node])]
+        return node
+
+    def log_odds(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            return np.float64(self.log_odds_one(X))
+        n, n_trees = len(X), len(self.roots)
+        out = np.empty(n)
+        step = max(1, TREE_BLOCK // n_trees)
+        for start in range(0, n, step):
+            Xb = X[start:start + step]
+            # Indices à plat dans le bloc : décalage de ligne + variable du nœud courant
+            rows = (np.arange(len(Xb)) * Xb.shape[1])[:, None]
+            node = self._descend(Xb.ravel(), rows, np.repeat(self.roots[None, :], len(Xb), axis=0))
+            out[start:start + step] = self.value[node].sum(axis=1)
+        out += self.base_margin
+        out[np.isnan(X).any(axis=1)] = np.nan
+        return out
+
+    def log_odds_one(self, x):
+        if np.isnan(x).any():
+            return float("nan")
+        return float(self.value[self._descend(x, 0, self.roots)].sum()) + self.base_margin
+
+
+BACKENDS = {backend.kind: backend for backend in (LogisticBackend, TreeEnsembleBackend)}
+
+
+class BurnoutModel:
+    # Artefact figé, chargé une fois par processus et partagé entre toutes les sessions :
+    # backend de scoring (coefficients logistiques ou arbres compilés), seuils des bandes et
+    # index des colonnes précalculé. Aucun pandas sur le chemin de scoring.
+
+    def __init__(self, backend, thresholds=(THRESHOLD, HIGH_THRESHOLD), version="logit1", cov=None,
+                 calibration=None):
+        # backend : instance d'un des BACKENDS, ou dictionnaire de coefficients (logistique)
+        self.backend = LogisticBackend(backend) if isinstance(backend, dict) else backend
+        self.version = version
+        self.features = self.backend.features
+        self.column_index = MappingProxyType({v: j for j, v in enumerate(self.features)})
+        self.linear = self.backend.linear
+        # Coefficients du modèle logistique ; None pour un modèle non linéaire
+        self.intercept = getattr(self.backend, "intercept", None)
+        self.coef = getattr(self.backend, "coef", None)
+        self.thresholds = _frozen(thresholds)
+        # Covariance estimée des coefficients, dans l'ordre ["const"] + features (facultative)
+        # (un tableau projeté en lecture seule est conservé tel quel, sans copie)
+        self.cov = None if cov is None else cov if isinstance(cov, np.memmap) else _frozen(cov)
+        if self.cov is not None and not self.linear:
+            raise ValueError("Covariance des coefficients fournie pour un modèle non linéaire")
+        if self.cov is not None and self.cov.shape != (len(self.features) + 1,) * 2:
+            raise ValueError(f"Covariance de forme {self.cov.shape}, attendue {(len(self.features) + 1,) * 2}")
+        # Empreinte des paramètres : invalide les artefacts dérivés quand le modèle change
+        self.digest = hashlib.sha1(self.backend.fingerprint()).hexdigest()[:12]
+        # Recalibration facultative des probabilités (écrite par calibrate.py) :
+        # Platt a * log-odds + b, ou isotonique (interpolation linéaire entre nœuds)
+        self.calibration = calibration
+        if calibration is None:
+            self._platt = self._knots = None
+        elif calibration["method"] == "platt":
+            self._platt, self._knots = (float(calibration["a"]), float(calibration["b"])), None
+        else:
+            self._platt, self._knots = None, (_frozen(calibration["x"]), _frozen(calibration["y"]))
+        # Un buffer d'entrée par thread : les sessions Streamlit tournent dans des threads distincts
+        self._local = threading.local()
+
+    def __getstate__(self):
+        # Envoi aux processus de calcul : le buffer par thread n'est pas transmis
+        state = self.__dict__.copy()
+        del state["_local"]
+        state["column_index"] = dict(self.column_index)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.column_index = MappingProxyType(state["column_index"])
+        for arr in vars(self.backend).values():
+            if isinstance(arr, np.ndarray):
+                arr.setflags(write=False)
+        self.thresholds.setflags(write=False)
+        self._local = threading.local()
+
+    @classmethod
+    def load(cls, path):
+        # Artefact écrit par train.py : model.json (coefficients, seuils) + covariance.npy,
+        # ou model.json + ensemble.json pour un ensemble d'arbres (registry.py import-ensemble),
+        # et bands.json (seuils calibrés, recalibration) écrit par calibrate.py
+        with open(os.path.join(path, "model.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["features"] != FEATURES:
+            raise ValueError(f"{path} : variables incompatibles avec l'encodeur du questionnaire")
+        kind = meta.get("backend", LogisticBackend.kind)
+        if kind not in BACKENDS:
+            raise ValueError(f"{path} : backend inconnu {kind!r}")
+        backend = BACKENDS[kind].from_artifact(path, meta)
+        if list(backend.features) != FEATURES:
+            raise ValueError(f"{path} : variables de l'ensemble incompatibles avec l'encodeur du questionnaire")
+        cov_path = os.path.join(path, "covariance.npy")
+        cov = np.load(cov_path, mmap_mode="r") if os.path.exists(cov_path) else None
+        model = cls(backend, meta.get("thresholds", (THRESHOLD, HIGH_THRESHOLD)), meta["version"], cov)
+        return model.with_bands(os.path.join(path, BANDS_FILE))
+
+    def with_bands(self, path):
+        # Applique une configuration de bandes si elle existe et correspond à ces coefficients
+        if not os.path.exists(path):
+            return self
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        if config["model_digest"] != self.digest:
+            raise ValueError(f"{path} : calibré pour un autre modèle ({config['model_digest']} ≠ {self.digest})")
+        return self.recalibrated(config["thresholds"], config.get("calibration"))
+
+    def recalibrated(self, thresholds, calibration):
+        # Même backend et covariance, autres seuils de bandes et recalibration
+        return BurnoutModel(self.backend, thresholds, self.version, self.cov, calibration)
+
+    def buffer(self):
+        buf = getattr(self._local, "buffer", None)
+        if buf is None:
+            buf = self._local.buffer = np.empty(len(self.features), dtype=np.float64)
+        return buf
+
+    def log_odds(self, X):
+        # X : matrice (n, len(features)) ou vecteur (len(features),)
+        return self.backend.log_odds(X)
+
+    def probability(self, X):
+        return self.calibrate(self.log_odds(X))
+
+    def log_odds_one(self, x):
+        return self.backend.log_odds_one(x)
+
+    def probability_one(self, x):
+        L = self.log_odds_one(x)
+        if self.calibration is not None:
+            return float(self.calibrate(L))
+        return 1 / (1 + math.exp(-L))
+
+    def calibrate(self, log_odds):
+        # Log-odds du modèle -> probabilité affichée (sigmoïde, puis recalibration éventuelle)
+        if self._platt is not None:
+            a, b = self._platt
+            return 1 / (1 + np.exp(-(a * log_odds + b)))
+        proba = 1 / (1 + np.exp(-log_odds))
+        if self._knots is not None:
+            return np.interp(proba, *self._knots)
+        return proba
+
+    def interval(self, X, level=0.95):
+        # Intervalle de confiance par la méthode delta : Var(log-odds) = z' Σ z avec z = [1, x],
+        # puis passage par la sigmoïde (intervalle asymétrique sur la probabilité)
+        if self.cov is None:
+            return None
+        X = np.asarray(X, dtype=np.float64)
+        Z = np.concatenate([np.ones(X.shape[:-1] + (1,)), X], axis=-1)
+        se = np.sqrt(np.einsum("...i,ij,...j->...", Z, self.cov, Z))
+        z = NormalDist().inv_cdf((1 + level) / 2)
+        L = self.log_odds(X)
+        return self.calibrate(L - z * se), self.calibrate(L + z * se)
+
+    def band(self, proba):
+        # 0 si proba < 0.2, 1 si 0.2 <= proba < 0.4, 2 sinon
+        return np.searchsorted(self.thresholds, proba, side="right")
+
+
+def _frozen(values, dtype=np.float64):
+    arr = np.array(values, dtype=dtype)
+    arr.setflags(write=False)
+    return arr
+
+
+COVARIANCE_PATH = os.path.join(ARTIFACTS_DIR, "covariance_logit1.npy")
+BANDS_PATH = os.path.join(ARTIFACTS_DIR, "bands_logit1.json")
+
+
+def builtin_model():
+    # La covariance du fit logit1 est facultative : sans elle, pas d'intervalle de confiance.
+    # Mis en cache par le registre, qui le recharge si la covariance ou les bandes changent.
+    cov = np.load(COVARIANCE_PATH) if os.path.exists(COVARIANCE_PATH) else None
+    return BurnoutModel(COEFFICIENTS, cov=cov).with_bands(BANDS_PATH)
+
+
+def get_model():
+    # Modèle actif du registre, rechargé à chaud quand l'artefact change sur le disque
+    from registry import REGISTRY
+
+    return REGISTRY.current()
@@ -0,0 +1,88 @@
+import io
+
+import numpy as np
+import streamlit as st
+
+from batch import detect_format
+from dashboard import AGE_GROUPS, BINS, FILTERS, MIN_GROUP, aggregate, content_hash
+from model import get_model
+from questions import QUESTION_BY_KEY
+
+# --- TABLEAU DE BORD D'ÉQUIPE ---
+st.set_page_config(page_title="Tableau de bord d'équipe", page_icon="👥", layout="centered")
+st.markdown("<style>footer {visibility: hidden;}</style>", unsafe_allow_html=True)
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def team_aggregate(digest, model_key, _model, _data, fmt):
+    # Mis en cache par empreinte du contenu et du modèle : rouvrir le même fichier ou
+    # changer de filtre ne relance pas le scoring. model_key décrit _model : le scoring
+    # utilise ce modèle-là, pas celui qui serait actif au moment du calcul
+    return aggregate(io.BytesIO(_data), _model, fmt)
+
+
+def main():
+    st.title("👥 Tableau de bord d'équipe")
+    st.markdown("""
+    Déposez l'export des réponses d'une équipe (CSV, Parquet ou JSONL, mêmes colonnes que le scoring par lots)
+    pour visualiser la distribution du risque estimé et les facteurs qui y contribuent le plus.
+    Aucune réponse individuelle n'est affichée.
+    """)
+
+    upload = st.file_uploader("Export des réponses", type=["csv", "parquet", "pq", "jsonl", "ndjson"])
+    if upload is None:
+        return
+
+    # L'empreinte n'est calculée qu'une fois par fichier déposé, pas à chaque rerun
+    cached = st.session_state.get("team_digest")
+    if cached is None or cached[0] != upload.file_id:
+        cached = st.session_state["team_digest"] = (upload.file_id, content_hash(upload.getvalue()))
+    model = get_model()
+    with st.spinner("Analyse du fichier…"):
+        agg = team_aggregate(cached[1], (model.version, model.digest, tuple(model.thresholds.tolist())), model,
+                             upload.getvalue(), detect_format(upload.name))
+
+    # --- Filtres : simples sommes de cellules déjà agrégées ---
+    with st.expander("Filtres", expanded=False):
+        selection = []
+        for key, options in zip(FILTERS, agg.filter_options):
+            chosen = st.multiselect(QUESTION_BY_KEY[key]["name"], options, default=options, key=f"filtre_{key}")
+            selection.append(np.isin(options, chosen))
+        chosen = st.multiselect("Tranche d'âge", AGE_GROUPS, default=AGE_GROUPS, key="filtre_age")
+        selection.append(np.isin(AGE_GROUPS, chosen))
+    result = agg.select(selection)
+
+    n = int(result["bands"].sum())
+    if n < MIN_GROUP:
+        st.warning(f"⚠️ Moins de {MIN_GROUP} réponses complètes dans cette sélection : résultats non affichés.")
+        return
+
+    low, high = agg.thresholds
+    col_n, col_low, col_high = st.columns(3)
+    col_n.metric("Réponses complètes", n)
+    col_low.metric(f"Risque ≥ {low * 100:.0f} %", f"{result['bands'][1:].sum() / n * 100:.1f} %")
+    col_high.metric(f"Risque ≥ {high * 100:.0f} %", f"{result['bands'][2:].sum() / n * 100:.1f} %")
+    if result["incomplete"]:
+        st.caption(f"{result['incomplete']} réponse(s) incomplète(s) écartée(s). Modèle : {agg.model_version}.")
+    else:
+        st.caption(f"Modèle : {agg.model_version}.")
+
+    st.subheader("📊 Distribution du risque estimé")
+    centers = (np.arange(BINS) + 0.5) * 100 / BINS
+    st.bar_chart({"Probabilité estimée (%)": centers, "Répondants": result["hist"]},
+                 x="Probabilité estimée (%)", y="Répondants")
+
+    if not agg.linear:
+        return
+    st.subheader("🔎 Principaux facteurs de risque")
+    st.markdown("Facteurs liés à l'organisation du travail : excès moyen de log-odds par rapport à la réponse "
+                "la plus favorable, d'après les coefficients du modèle.")
+    contrib = np.where(agg.actionable, result["contrib"] / n, 0.0)
+    order = np.argsort(contrib)[::-1][:5]
+    st.markdown("\n".join(
+        f"- **{agg.factors[j]}** : +{contrib[j]:.2f} (cote de risque × {np.exp(contrib[j]):.2f})"
+        for j in order if contrib[j] > 0
+    ))
+
+
+main()
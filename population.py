@@ -0,0 +1,239 @@
+import argparse
+import functools
+import hashlib
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+from model import ARTIFACTS_DIR, get_model
+from questions import ENCODER
+
+# --- DISTRIBUTION DE RÉFÉRENCE DES LOG-ODDS ---
+# Le modèle est additif en log-odds sur des réponses discrètes : la distribution du
+# score dans la population s'obtient en convoluant, question par question, les
+# histogrammes de contributions pondérés par les fréquences de réponse observées
+# (hypothèse d'indépendance entre questions). L'espace des réponses compte des
+# millions de combinaisons ; la convolution sur une grille régulière prend quelques ms.
+#
+#   python population.py marginals reference.csv   # fréquences de réponse -> artifacts/marginals.json
+#   python population.py build                     # convolution -> artifacts/population_<modèle>.npy
+
+MARGINALS_PATH = os.path.join(ARTIFACTS_DIR, "marginals.json")
+STEP = 0.002
+
+
+# --- Fréquences de réponse (marges) ---
+
+def count_marginals(chunks):
+    counts = [np.zeros(n, dtype=np.int64) for n in ENCODER.n_options]
+    numeric = [{} for _ in ENCODER.numeric]
+    for df in chunks:
+        idx = ENCODER.frame_indices(df)
+        for i, n in enumerate(ENCODER.n_options):
+            counts[i] += np.bincount(idx[:, i], minlength=n + 1)[:n]
+        values = ENCODER.frame_numeric(df)
+        for j in range(len(ENCODER.numeric)):
+            v, c = np.unique(np.rint(values[:, j][~np.isnan(values[:, j])]), return_counts=True)
+            for value, count in zip(v.astype(int).tolist(), c.tolist()):
+                numeric[j][value] = numeric[j].get(value, 0) + count
+
+    return {
+        "questions": {
+            q["key"]: dict(zip(q["options"], c.tolist())) for q, c in zip(ENCODER.categorical, counts)
+        },
+        "numeric": {
+            q["key"]: {str(v): c for v, c in sorted(num.items())} for q, num in zip(ENCODER.numeric, numeric)
+        }
+    }
+
+
+def load_marginals(path=MARGINALS_PATH):
+    # Relu seulement si le fichier a changé sur le disque
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _read_marginals(path, mtime)
+
+
+@functools.lru_cache(maxsize=4)
+def _read_marginals(path, mtime):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def marginals_digest(path=MARGINALS_PATH):
+    # Empreinte du contenu des marges (None si absentes) : clé du cache et validation sur disque
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _file_digest(path, mtime)
+
+
+@functools.lru_cache(maxsize=4)
+def _file_digest(path, mtime):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+
+def option_weights(marginals):
+    # Probabilités par option, alignées sur ENCODER ; les options « manquantes » ont un poids nul
+    weights = []
+    for i, q in enumerate(ENCODER.categorical):
+        counts = marginals["questions"].get(q["key"], {})
+        w = np.array([counts.get(label, 0) for label in q["options"]], dtype=np.float64)
+        w[ENCODER.missing[ENCODER.offsets[i]:ENCODER.offsets[i] + ENCODER.n_options[i]]] = 0
+        if w.sum() == 0:
+            w = (~ENCODER.missing[ENCODER.offsets[i]:ENCODER.offsets[i] + ENCODER.n_options[i]]).astype(np.float64)
+        weights.append(w / w.sum())
+    return weights
+
+
+def numeric_weights(marginals):
+    # (valeurs, probabilités) pour chaque question numérique (âge)
+    out = []
+    for q in ENCODER.numeric:
+        counts = marginals["numeric"].get(q["key"]) or {str(v): 1 for v in range(q["min"], q["max"] + 1)}
+        values = np.array([float(v) for v in counts])
+        w = np.array(list(counts.values()), dtype=np.float64)
+        out.append((values, w / w.sum()))
+    return out
+
+
+# --- Convolution ---
+
+def _convolve(pmf, start, contributions, weights, step):
+    k = np.rint(contributions / step).astype(np.int64)
+    kmin = int(k.min())
+    kernel = np.bincount(k - kmin, weights=weights)
+    return np.convolve(pmf, kernel), start + kmin * step
+
+
+def build_distribution(model, marginals, step=STEP):
+    pmf, start = np.ones(1), model.intercept
+    for i, w in enumerate(option_weights(marginals)):
+        cols = ENCODER.cat_cols[ENCODER.cat_owner == i]
+        if not len(cols):
+            continue
+        rows = ENCODER.table[ENCODER.offsets[i]:ENCODER.offsets[i] + ENCODER.n_options[i]]
+        keep = w > 0
+        contributions = rows[keep][:, cols] @ model.coef[cols]
+        pmf, start = _convolve(pmf, start, contributions, w[keep], step)
+    for col, (values, w) in zip(ENCODER.numeric_cols, numeric_weights(marginals)):
+        pmf, start = _convolve(pmf, start, values * model.coef[col], w, step)
+
+    cdf = np.cumsum(pmf)
+    return PopulationDistribution(cdf / cdf[-1], start, step)
+
+
+class PopulationDistribution:
+    def __init__(self, cdf, start, step):
+        self.cdf = cdf
+        self.start = start
+        self.step = step
+
+    def percentile(self, log_odds):
+        # Grille régulière : accès direct à la case, sans parcours de la distribution
+        i = int(np.floor((log_odds - self.start) / self.step + 0.5))
+        if i < 0:
+            return 0.0
+        return 100 * float(self.cdf[min(i, len(self.cdf) - 1)])
+
+    def save(self, path, model, marginals):
+        # Écritures atomiques (plusieurs sessions peuvent construire la même distribution) :
+        # tableau puis métadonnées ; un lecteur qui les verrait dépareillés est détecté par la taille
+        meta = {"start": self.start, "step": self.step, "size": len(self.cdf), "model_version": model.version,
+                "model_digest": model.digest, "marginals_digest": marginals}
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.cdf))
+        os.replace(tmp, path + ".npy")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path + ".json")
+
+    @classmethod
+    def load(cls, path, model, marginals):
+        # Tableau projeté en mémoire : partagé par les processus, rien n'est recopié au démarrage.
+        # Sans marges connues (marginals None), seul le modèle est vérifié.
+        if not (os.path.exists(path + ".npy") and os.path.exists(path + ".json")):
+            return None
+        with open(path + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["model_digest"] != model.digest:
+            return None
+        if marginals is not None and meta.get("marginals_digest") != marginals:
+            return None
+        cdf = np.load(path + ".npy", mmap_mode="r")
+        if len(cdf) != meta.get("size", len(cdf)):
+            return None
+        return cls(cdf, meta["start"], meta["step"])
+
+
+def distribution_path(model):
+    return os.path.join(ARTIFACTS_DIR, f"population_{model.version}")
+
+
+@functools.lru_cache(maxsize=8)
+def _distribution(model, marginals):
+    # Convolution exacte des contributions : modèle logistique seulement. Une entrée par
+    # (modèle, empreinte des marges) ; distribution indisponible : LookupError, jamais mise
+    # en cache (les marges peuvent apparaître plus tard)
+    if not model.linear:
+        return None
+    path = distribution_path(model)
+    dist = PopulationDistribution.load(path, model, marginals)
+    if dist is None:
+        counts = load_marginals()
+        if counts is None:
+            raise LookupError(MARGINALS_PATH)
+        os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+        build_distribution(model, counts).save(path, model, marginals)
+        dist = PopulationDistribution.load(path, model, marginals)
+        if dist is None:
+            raise LookupError(path)
+    return dist
+
+
+def get_distribution(model=None):
+    # None si aucune marge de référence n'est disponible ; reconstruite quand les marges changent
+    try:
+        return _distribution(model or get_model(), marginals_digest())
+    except LookupError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distribution de référence des scores dans la population.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("marginals", help="compte les fréquences de réponse d'un fichier de référence")
+    p.add_argument("input", help="fichier de réponses codées (CSV, Parquet ou JSONL)")
+    p.add_argument("--chunksize", type=int, default=50_000)
+    p = sub.add_parser("build", help="convolue les contributions et écrit la distribution")
+    p.add_argument("--step", type=float, default=STEP, help="pas de la grille des log-odds")
+    args = parser.parse_args(argv)
+
+    os.makedirs(ARTIFACTS_DIR, exist_ok=True)
+    if args.command == "marginals":
+        from batch import read_chunks
+
+        marginals = count_marginals(read_chunks(args.input, args.chunksize))
+        with open(MARGINALS_PATH, "w", encoding="utf-8") as f:
+            json.dump(marginals, f, ensure_ascii=False, indent=1)
+        print(f"Marges écrites dans {MARGINALS_PATH}", file=sys.stderr)
+    else:
+        marginals = load_marginals()
+        if marginals is None:
+            parser.error(f"{MARGINALS_PATH} introuvable : lancez d'abord « population.py marginals »")
+        model = get_model()
+        dist = build_distribution(model, marginals, args.step)
+        dist.save(distribution_path(model), model, marginals_digest())
+        print(f"Distribution ({len(dist.cdf)} cases) écrite dans {distribution_path(model)}.npy", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
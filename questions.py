@@ -0,0 +1,398 @@
+import numpy as np
+
+from model import FEATURES
+
+# --- QUESTIONNAIRE DÉCLARATIF ---
+# Chaque question décrit son libellé, ses options, le code de chaque option et les
+# colonnes du modèle qu'elle alimente. Les widgets, les messages de réponses manquantes
+# et le vecteur d'entrée du modèle sont tous dérivés de cette table.
+# « modifiable » marque les conditions de travail sur lesquelles on peut agir
+# (panneau « Et si… ») ; les caractéristiques personnelles ne le sont pas.
+
+NSP = "Je ne sais pas / Je préfère ne pas répondre"
+NA = np.nan
+
+FREQUENCE = ["Toujours", "Souvent", "Parfois", "Jamais"]
+
+REVENU_DUMMIES = [
+    "revmensc_tranche_1351–1700",
+    "revmensc_tranche_1701–2250",
+    "revmensc_tranche_2251–3000",
+    "revmensc_tranche_> 3000"
+]
+
+QUESTIONS = [
+    # 📌 Informations personnelles et emploi
+    {
+        "key": "age",
+        "label": "Quel est votre âge ?",
+        "widget": "slider",
+        "min": 18, "max": 64, "value": 30,
+        "columns": ["AGE"],
+        "name": "Âge"
+    },
+    {
+        "key": "genre",
+        "label": "Quel est votre genre ?",
+        "widget": "selectbox",
+        "options": {
+            "Femme": 1,
+            "Homme": 0,
+            "Autre/Ne souhaite pas répondre": NA
+        },
+        "columns": ["sexe"],
+        "name": "Genre"
+    },
+    {
+        "key": "diplome",
+        "label": "Quel est votre niveau de diplôme le plus élevé obtenu ?",
+        "widget": "selectbox",
+        "options": {
+            "Aucun diplôme ou primaire": 0,
+            "CAP / BEP / Bac": 1,
+            "Bac +2 (BTS, DUT, etc.)": 2,
+            "Bac +3 ou plus (Licence, Master...)": 3
+        },
+        "columns": ["niv_diplome_reg"],
+        "name": "Niveau de diplôme"
+    },
+    {
+        "key": "type_emploi",
+        "label": "Quel est votre type d'emploi actuel ?",
+        "widget": "selectbox",
+        "options": {
+            "1 - Fonctionnaire titulaire": 1,
+            "2 - Fonctionnaire non titulaire": 2,
+            "3 - Salarié permanent CDI": 3,
+            "4 - Salarié temporaire ou CDD": 4,
+            "5 - Intérimaire": 5,
+            "6 - Indépendant / à son compte": 6,
+            "7 - Aide familiale": 7
+        },
+        "columns": ["TYPEMPLOI"],
+        "name": "Type d'emploi"
+    },
+    {
+        # "≤ 1350" est la modalité de référence : aucune dummy n'est activée
+        "key": "revenu",
+        "label": "Quel est votre revenu mensuel net moyen (en €) ?",
+        "widget": "selectbox",
+        "options": {
+            "Je préfère ne pas répondre": (0, 0, 0, 0),
+            "≤ 1350": (0, 0, 0, 0),
+            "1351–1700": (1, 0, 0, 0),
+            "1701–2250": (0, 1, 0, 0),
+            "2251–3000": (0, 0, 1, 0),
+            "> 3000": (0, 0, 0, 1)
+        },
+        "columns": REVENU_DUMMIES,
+        "name": "Revenu mensuel",
+        # Colonne brute des fichiers de réponses (libellé de la tranche) ; une tranche
+        # absente y est traitée comme un refus de répondre
+        "source": "revmensc_tranche",
+        "default": "Je préfère ne pas répondre",
+        "warnings": {
+            "Je préfère ne pas répondre": "Vous avez choisi de ne pas répondre à cette question. La prédiction pourrait être légèrement moins précise."
+        }
+    },
+
+    # ⏰ Conditions de travail
+    {
+        "key": "cvfvp",
+        "modifiable": True,
+        "label": "Comment jugez-vous votre équilibre entre vie professionnelle et vie personnelle ?",
+        "options": {
+            "Très bien": 1,
+            "Bien": 1,
+            "Pas très bien": 0,
+            "Pas bien du tout": 0,
+            NSP: NA
+        },
+        "columns": ["CVFVP_reg"],
+        "name": "Équilibre vie professionnelle / personnelle"
+    },
+    {
+        "key": "previs",
+        "modifiable": True,
+        "label": "À quel moment êtes-vous informé·e de vos horaires de travail ?",
+        "options": {
+            "Au moins un mois à l’avance": 1,
+            "Au moins une semaine à l’avance": 2,
+            "La veille": 3,
+            "Le jour même ou pas du tout": 4,
+            NSP: NA
+        },
+        "columns": ["PREVIS"],
+        "name": "Prévisibilité des horaires"
+    },
+    {
+        # Recodage INITIAT_reg (1 à 4 conservés, 8/9 → NaN)
+        "key": "initiat",
+        "modifiable": True,
+        "label": "Votre travail nécessite-t-il que vous preniez des initiatives ?",
+        "options": dict(zip(FREQUENCE, [1, 2, 3, 4]), **{NSP: NA}),
+        "columns": ["INITIAT_reg"],
+        "name": "Nécessité de prendre des initiatives"
+    },
+    {
+        "key": "idee",
+        "modifiable": True,
+        "label": "Avez-vous la possibilité de mettre vos propres idées en pratique dans votre travail ?",
+        "options": dict(zip(FREQUENCE, [1, 1, 0, 0]), **{NSP: NA}),
+        "columns": ["IDEE_reg"],
+        "name": "Possibilité de mettre ses idées en pratique"
+    },
+    {
+        "key": "quanti",
+        "modifiable": True,
+        "label": "Pouvez-vous intervenir sur la quantité de travail qui vous est attribuée ?",
+        "options": dict(zip(FREQUENCE, [1, 1, 0, 0]), **{NSP: NA}),
+        "columns": ["QUANTI_reg"],
+        "name": "Intervenir sur la quantité de travail"
+    },
+    {
+        "key": "bienetr1",
+        "label": "Comment évaluez-vous votre bien-être global ces dernières semaines ?",
+        "options": {"Plutôt bien": 1, "Plutôt mal": 0, NSP: NA},
+        "columns": ["BIENETR1_reg"],
+        "name": "Bien-être global"
+    },
+
+    # 🤝 Relations professionnelles
+    {
+        "key": "tension2",
+        "modifiable": True,
+        "label": "Vivez-vous des situations de tension dans vos rapports avec vos supérieurs hiérarchiques (suffisamment fréquentes pour perturber votre travail) ?",
+        "options": {
+            "Oui": 1,
+            "Non": 0,
+            "Sans objet (pas de supérieur hiérarchique)": NA,
+            NSP: NA
+        },
+        "columns": ["TENSION2_reg"],
+        "name": "Tensions avec la hiérarchie"
+    },
+    {
+        "key": "rp1",
+        "label": "Y a-t-il quelqu’un sur qui vous pouvez compter pour discuter de choses personnelles ou pour prendre une décision difficile ?",
+        "options": {"Oui": 1, "Non": 0, NSP: NA},
+        "columns": ["RP1_reg"],
+        "name": "Soutien social"
+    },
+    {
+        "key": "acchef",
+        "modifiable": True,
+        "label": "Vous arrive-t-il d’être en désaccord avec vos supérieurs sur la façon de bien faire votre travail ?",
+        "options": dict(zip(FREQUENCE, [3, 2, 1, 0]), **{NSP: NA}),
+        "columns": ["ACCHEF_reg"],
+        "name": "Désaccord avec le supérieur"
+    },
+    {
+        "key": "aidcoll",
+        "modifiable": True,
+        "label": "Si vous avez du mal à faire un travail délicat ou compliqué, êtes-vous aidé·e par les personnes avec qui vous travaillez habituellement ?",
+        "options": {
+            "Oui": 1,
+            "Non": 0,
+            "Sans objet / Je ne sais pas / Je préfère ne pas répondre": NA
+        },
+        "columns": ["AIDCOLL_reg"],
+        "name": "Aide des collègues"
+    },
+    {
+        "key": "infoconf",
+        "modifiable": True,
+        "label": "Pouvez-vous faire confiance aux informations qui viennent de vos supérieurs ou responsables ?",
+        "options": dict(zip(FREQUENCE, [3, 2, 1, 0]), **{"Sans objet / Je ne sais pas / Je préfère ne pas répondre": NA}),
+        "columns": ["INFOCONF_reg"],
+        "name": "Confiance dans les informations"
+    },
+
+    # ⚠️ Événements de vie marquants
+    {
+        "key": "rp4b",
+        "label": "Au cours des trois dernières années, un événement vous a-t-il marqué, comme de graves problèmes de santé d’un proche ou le décès d’un parent (père, mère, autre) ?",
+        "options": {"Oui": 1, "Non": 0, NSP: NA},
+        "columns": ["RP4B_reg"],
+        "name": "Événement de vie marquant"
+    },
+
+    # 📲 Intrusion du travail dans la vie privée
+    {
+        "key": "joinext",
+        "modifiable": True,
+        "label": "Au cours des douze derniers mois, avez-vous été contacté·e en dehors de vos horaires de travail par des personnes extérieures à l’entreprise pour les besoins du travail ?",
+        "options": {
+            "Oui": 1,
+            "Non": 0,
+            "Sans objet / Je travaille seul·e / Je ne sais pas / Je préfère ne pas répondre": NA
+        },
+        "columns": ["JOINEXT_reg"],
+        "name": "Contacts hors temps de travail"
+    },
+
+    # 📉 Ressenti au travail
+    {
+        "key": "rpb1e",
+        "modifiable": True,
+        "label": "Au travail, vous arrive-t-il d’être chargé·e de tâches inutiles ou dégradantes ?",
+        "options": {"Oui": 1, "Non": 0, NSP: NA},
+        "columns": ["RPB1E_b"],
+        "name": "Tâches inutiles ou dégradantes"
+    },
+    {
+        # Posée mais non retenue dans le modèle logit1
+        "key": "rpb1h",
+        "label": "Vous est-il déjà arrivé d’être empêché·e de vous exprimer dans votre travail ?",
+        "options": {"Oui": 1, "Non": 0, NSP: NA},
+        "columns": [],
+        "name": "Empêché·e de s'exprimer"
+    },
+    {
+        "key": "rpb1j",
+        "modifiable": True,
+        "label": "Avez-vous subi des moqueries ou blagues blessantes dans votre environnement de travail ?",
+        "options": {"Oui": 1, "Non": 0, NSP: NA},
+        "columns": ["RPB1J_b"],
+        "name": "Moqueries ou blagues blessantes"
+    },
+    {
+        "key": "rpb5e",
+        "modifiable": True,
+        "label": "Dans votre travail, ressentez-vous souvent de l’ennui ?",
+        "options": dict(zip(FREQUENCE, [1, 1, 0, 0]), **{NSP: NA}),
+        "columns": ["RPB5E_b"],
+        "name": "Ennui au travail"
+    }
+]
+
+# Découpage du questionnaire en sections (titre, clés des questions)
+SECTIONS = [
+    ("📌 Informations personnelles et emploi", ["age", "genre", "diplome", "type_emploi", "revenu"]),
+    ("⏰ Conditions de travail", ["cvfvp", "previs", "initiat", "idee", "quanti", "bienetr1"]),
+    ("🤝 Relations professionnelles", ["tension2", "rp1", "acchef", "aidcoll", "infoconf"]),
+    ("⚠️ Événements de vie marquants", ["rp4b"]),
+    ("📲 Intrusion du travail dans la vie privée", ["joinext"]),
+    ("📉 Ressenti au travail", ["rpb1e", "rpb1h", "rpb1j", "rpb5e"])
+]
+
+QUESTION_BY_KEY = {q["key"]: q for q in QUESTIONS}
+
+
+class Encoder:
+    # Table compilée une seule fois par processus : chaque option de chaque question
+    # devient une ligne de `table` (len(FEATURES) colonnes). Encoder un profil revient
+    # alors à un seul gather indexé, sans aucune branche par question.
+
+    def __init__(self, questions, features):
+        self.features = list(features)
+        col_index = {v: j for j, v in enumerate(self.features)}
+
+        self.categorical = [q for q in questions if "options" in q]
+        self.numeric = [q for q in questions if "options" not in q]
+        self.keys = [q["key"] for q in self.categorical]
+        self.position = {k: i for i, k in enumerate(self.keys)}
+
+        # Une ligne par option, plus une ligne « non renseigné » (NaN) par question
+        sizes = np.array([len(q["options"]) + 1 for q in self.categorical])
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        self.n_options = sizes - 1
+        self.unanswered = self.n_options.copy()
+        self.table = np.zeros((sizes.sum(), len(self.features)), dtype=np.float64)
+
+        owner = np.full(len(self.features), -1)
+        self.option_index = []
+        self.default_index = np.empty(len(self.categorical), dtype=np.intp)
+        for i, q in enumerate(self.categorical):
+            cols = [col_index[c] for c in q["columns"]]
+            owner[cols] = i
+            labels = list(q["options"])
+            self.option_index.append({label: o for o, label in enumerate(labels)})
+            for o, label in enumerate(labels):
+                self.table[self.offsets[i] + o, cols] = np.atleast_1d(q["options"][label])
+            self.table[self.offsets[i] + self.n_options[i], cols] = np.nan
+            default = q.get("default")
+            self.default_index[i] = labels.index(default) if default is not None else self.n_options[i]
+
+        self.numeric_cols = np.array([col_index[q["columns"][0]] for q in self.numeric], dtype=np.intp)
+        owner[self.numeric_cols] = -2
+        missing_cols = [f for f, o in zip(self.features, owner) if o == -1]
+        if missing_cols:
+            raise ValueError(f"Variables du modèle sans question associée : {missing_cols}")
+
+        self.cat_cols = np.flatnonzero(owner >= 0)
+        self.cat_owner = owner[self.cat_cols]
+        # Une option est « manquante » si elle produit un NaN dans l'une des colonnes du modèle
+        self.missing = np.isnan(self.table).any(axis=1)
+        self.table.setflags(write=False)
+
+    # --- Interface questionnaire ---
+
+    def indices(self, answers):
+        # answers : {clé de question: libellé choisi} -> indices d'options (Q,)
+        return np.array(
+            [self.option_index[i].get(answers.get(k), self.unanswered[i]) for i, k in enumerate(self.keys)],
+            dtype=np.intp
+        )
+
+    def numeric_values(self, answers):
+        return np.array([answers.get(q["key"], np.nan) for q in self.numeric], dtype=np.float64)
+
+    def encode_answers(self, answers, out=None):
+        return self.encode(self.indices(answers), self.numeric_values(answers), out)
+
+    def missing_questions(self, idx):
+        return [self.categorical[i] for i in np.flatnonzero(self.missing[self.offsets + idx])]
+
+    # --- Encodage vectorisé (un profil ou une matrice de profils) ---
+
+    def encode(self, idx, numeric, out=None):
+        idx = np.asarray(idx)
+        if out is None:
+            out = np.empty(idx.shape[:-1] + (len(self.features),), dtype=np.float64)
+        out[..., self.cat_cols] = self.table[(self.offsets + idx)[..., self.cat_owner], self.cat_cols]
+        out[..., self.numeric_cols] = numeric
+        return out
+
+    # --- Fichiers de réponses codées ---
+
+    def frame_indices(self, df, out=None):
+        # Retrouve, pour chaque ligne, l'option dont l'encodage correspond aux codes du fichier.
+        # Les valeurs absentes ou inconnues sont considérées comme non renseignées.
+        import pandas as pd
+
+        n = len(df)
+        idx = out[:n] if out is not None else np.empty((n, len(self.categorical)), dtype=np.intp)
+        for i, q in enumerate(self.categorical):
+            idx[:, i] = self.unanswered[i]
+            source = q.get("source")
+            if source is not None and source in df.columns and not any(c in df.columns for c in q["columns"]):
+                raw = df[source].astype("string").str.strip()
+                idx[:, i] = raw.map(self.option_index[i]).fillna(self.default_index[i]).to_numpy(dtype=np.intp)
+            elif q["columns"] and all(c in df.columns for c in q["columns"]):
+                values = np.column_stack([
+                    pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+                    for c in q["columns"]
+                ])
+                rows = self.table[self.offsets[i]:self.offsets[i] + self.n_options[i]][:, [self.features.index(c) for c in q["columns"]]]
+                match = (values[:, None, :] == rows[None, :, :]).all(axis=2)
+                found = match.any(axis=1)
+                idx[found, i] = match[found].argmax(axis=1)
+        return idx
+
+    def frame_numeric(self, df, out=None):
+        import pandas as pd
+
+        n = len(df)
+        values = out[:n] if out is not None else np.empty((n, len(self.numeric)), dtype=np.float64)
+        for j, q in enumerate(self.numeric):
+            col = q["columns"][0]
+            values[:, j] = (
+                pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+                if col in df.columns else np.nan
+            )
+        return values
+
+
+# Compilé une fois à l'import : partagé par l'application et le scoring par lots
+ENCODER = Encoder(QUESTIONS, FEATURES)
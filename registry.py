@@ -0,0 +1,216 @@
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from model import (BANDS_FILE, BANDS_PATH, COVARIANCE_PATH, ENSEMBLE_FILE, FEATURES, HIGH_THRESHOLD, MODELS_DIR,
+                   THRESHOLD, BurnoutModel, TreeEnsembleBackend, builtin_model)
+
+# --- REGISTRE DES MODÈLES VERSIONNÉS ---
+# Chaque version est un répertoire <MODELS_DIR>/<version>/ écrit par train.py
+# (model.json + covariance.npy, bands.json écrit par calibrate.py) ou, pour un ensemble
+# d'arbres, par « import-ensemble » (model.json + ensemble.json). Le fichier
+# ACTIVE désigne la version servie ; sans lui, c'est le modèle logit1 intégré.
+# Le registre surveille l'artefact actif (mtime/taille, puis empreinte du contenu)
+# et recharge le modèle à chaud : le remplacement est une simple affectation de
+# référence, donc une soumission en cours garde le modèle qu'elle a obtenu et les
+# suivantes voient le nouveau, sans redémarrer le serveur.
+#
+#   python registry.py list
+#   python registry.py activate 2026-10-01
+#   python registry.py import-ensemble gbm.json gbm-2026-10
+
+logger = logging.getLogger("burnout.registry")
+
+ACTIVE_FILE = "ACTIVE"
+# Intervalle minimal entre deux vérifications du disque (secondes)
+CHECK_INTERVAL = 1.0
+ARTIFACT_FILES = ("model.json", "covariance.npy", ENSEMBLE_FILE, BANDS_FILE)
+
+
+class ModelRegistry:
+
+    def __init__(self, models_dir=MODELS_DIR, check_interval=CHECK_INTERVAL, pinned=None):
+        self.models_dir = models_dir
+        self.check_interval = check_interval
+        # Chemin d'artefact imposé (variable BURNOUT_MODEL) : le pointeur ACTIVE est ignoré
+        self.pinned = pinned
+        self._model = None
+        self._signature = None
+        self._hash = None
+        self._checked = float("-inf")
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def current(self):
+        # Chemin rapide sans verrou : une lecture d'horloge et d'attribut par appel
+        if self._model is None or time.monotonic() - self._checked >= self.check_interval:
+            self._refresh()
+        return self._model
+
+    def _refresh(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._model is not None and now - self._checked < self.check_interval:
+                return
+            self._checked = now
+            path = self.active_path()
+            signature = _signature(self._pointer(), path)
+            if self._model is not None and signature == self._signature:
+                return
+            # Un artefact défaillant n'est signalé qu'une fois, jusqu'à sa prochaine modification
+            self._signature = signature
+            try:
+                digest = _content_hash(path)
+                if digest != self._hash:
+                    model = builtin_model() if path is None else BurnoutModel.load(path)
+                    # Échange atomique : les lecteurs voient l'ancien ou le nouveau modèle, jamais un mélange
+                    self._model, self._hash = model, digest
+                    self.reloads += 1
+                    logger.info("Modèle actif : %s (%s)", model.version, digest[:12])
+            except Exception:
+                if self._model is None:
+                    raise
+                # Artefact illisible ou incompatible (écriture en cours ?) : on garde le modèle servi
+                logger.exception("Rechargement impossible, on conserve %s", self._model.version)
+
+    def _pointer(self):
+        return None if self.pinned else os.path.join(self.models_dir, ACTIVE_FILE)
+
+    def active_version(self):
+        try:
+            with open(os.path.join(self.models_dir, ACTIVE_FILE), encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def active_path(self):
+        if self.pinned:
+            return self.pinned
+        version = self.active_version()
+        return None if version is None else os.path.join(self.models_dir, version)
+
+    def versions(self):
+        if not os.path.isdir(self.models_dir):
+            return []
+        return sorted(v for v in os.listdir(self.models_dir)
+                      if os.path.exists(os.path.join(self.models_dir, v, "model.json")))
+
+    def activate(self, version):
+        # Vérifie que l'artefact se charge avant de basculer, puis remplace le pointeur atomiquement
+        BurnoutModel.load(os.path.join(self.models_dir, version))
+        pointer = os.path.join(self.models_dir, ACTIVE_FILE)
+        tmp = f"{pointer}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(version + "\n")
+        os.replace(tmp, pointer)
+        # Prochain appel à current() : vérification immédiate
+        self._checked = float("-inf")
+
+
+def import_ensemble(dump_path, version, thresholds=(THRESHOLD, HIGH_THRESHOLD), models_dir=MODELS_DIR):
+    # Nouvelle version à partir d'un export JSON d'arbres ; l'ensemble est compilé une fois
+    # pour vérifier l'export avant d'écrire quoi que ce soit
+    with open(dump_path, encoding="utf-8") as f:
+        dump = json.load(f)
+    backend = TreeEnsembleBackend(dump)
+    if list(backend.features) != FEATURES:
+        raise ValueError(f"{dump_path} : variables incompatibles avec l'encodeur du questionnaire")
+    path = os.path.join(models_dir, version)
+    os.makedirs(path, exist_ok=False)
+    with open(os.path.join(path, ENSEMBLE_FILE), "w", encoding="utf-8") as f:
+        json.dump(dump, f)
+    meta = {
+        "version": version,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "source": os.path.abspath(dump_path),
+        "backend": TreeEnsembleBackend.kind,
+        "features": FEATURES,
+        "thresholds": list(thresholds),
+        "trees": len(backend.roots),
+        "nodes": len(backend.feature),
+        "max_depth": backend.depth,
+    }
+    with open(os.path.join(path, "model.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    return path
+
+
+def _files(path):
+    if path is None:
+        return [COVARIANCE_PATH, BANDS_PATH]
+    return [os.path.join(path, name) for name in ARTIFACT_FILES]
+
+
+def _signature(pointer, path):
+    # Changement détecté à bas coût par (mtime, taille) du pointeur et des fichiers de l'artefact
+    signature = []
+    for name in [pointer] + _files(path):
+        try:
+            st = os.stat(name)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except (FileNotFoundError, TypeError):
+            signature.append(None)
+    return tuple(signature)
+
+
+def _content_hash(path):
+    # Empreinte du contenu : un simple « touch » ne provoque pas de rechargement
+    h = hashlib.sha256(b"builtin" if path is None else b"")
+    for name in _files(path):
+        try:
+            with open(name, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+        except FileNotFoundError:
+            h.update(b"-")
+    return h.hexdigest()
+
+
+REGISTRY = ModelRegistry(pinned=os.environ.get("BURNOUT_MODEL") or None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Registre des versions du modèle de risque de burn-out.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="liste les versions disponibles")
+    show = sub.add_parser("show", help="affiche les métadonnées d'une version (par défaut : l'active)")
+    show.add_argument("version", nargs="?")
+    activate = sub.add_parser("activate", help="désigne la version servie (rechargée à chaud par l'application)")
+    activate.add_argument("version")
+    ensemble = sub.add_parser("import-ensemble", help="crée une version à partir d'un ensemble d'arbres exporté en JSON")
+    ensemble.add_argument("dump", help="export JSON (format décrit dans model.TreeEnsembleBackend)")
+    ensemble.add_argument("version")
+    ensemble.add_argument("--thresholds", type=float, nargs=2, default=(THRESHOLD, HIGH_THRESHOLD))
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        active = REGISTRY.active_version()
+        for version in REGISTRY.versions():
+            print(("* " if version == active else "  ") + version)
+        if active is None:
+            print("* logit1 (intégré)")
+    elif args.command == "show":
+        version = args.version or REGISTRY.active_version()
+        if version is None:
+            print("logit1 (intégré)")
+            return
+        with open(os.path.join(REGISTRY.models_dir, version, "model.json"), encoding="utf-8") as f:
+            print(json.dumps(json.load(f), indent=2, ensure_ascii=False))
+    elif args.command == "import-ensemble":
+        try:
+            path = import_ensemble(args.dump, args.version, args.thresholds, REGISTRY.models_dir)
+        except (ValueError, KeyError) as e:
+            parser.error(f"export invalide : {e}")
+        print(f"Version {args.version} écrite dans {path} (python registry.py activate {args.version} pour la servir)")
+    else:
+        REGISTRY.activate(args.version)
+        print(f"Version active : {args.version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from questions import QUESTIONS
+
+# --- REPRISE D'UN QUESTIONNAIRE INTERROMPU ---
+# Facultatif (BURNOUT_RESUME=<chemin de la base>). À chaque réponse modifiée, les
+# réponses déjà données sont conservées dans une petite base SQLite locale sous un jeton aléatoire
+# placé dans l'URL (?reprise=<jeton>) : après une coupure de connexion, le navigateur
+# rouvre la même adresse et les réponses sont restaurées. Les jetons expirent après TTL
+# secondes ; « Recommencer » supprime le jeton et ses réponses.
+#
+#   BURNOUT_RESUME=/var/lib/burnout/reprise.sqlite streamlit run app.py
+#   python resume.py purge
+
+# Chemin de la base ; vide (par défaut) : reprise désactivée
+RESUME_PATH = os.environ.get("BURNOUT_RESUME", "")
+TTL = 2 * 3600.0
+QUERY_PARAM = "reprise"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (token TEXT PRIMARY KEY, answers TEXT NOT NULL, expires REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS answers_expires ON answers (expires);
+"""
+
+
+def valid_answers(answers):
+    # Ne restaure que des réponses encore proposées par le questionnaire (options, bornes)
+    valid = {}
+    for q in QUESTIONS:
+        value = answers.get(q["key"])
+        if value is None:
+            continue
+        if "options" in q:
+            if value in q["options"]:
+                valid[q["key"]] = value
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and q["min"] <= value <= q["max"]:
+            valid[q["key"]] = value
+    return valid
+
+
+class ResumeStore:
+
+    def __init__(self, path=RESUME_PATH, ttl=TTL):
+        self.path = path
+        self.ttl = ttl
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def new_token():
+        return secrets.token_urlsafe(16)
+
+    def save(self, token, answers):
+        # Une ligne par jeton ; les jetons expirés sont supprimés au passage
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM answers WHERE expires < ?", (now,))
+                conn.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?)",
+                             (token, json.dumps(answers, ensure_ascii=False), now + self.ttl))
+
+    def load(self, token):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT answers FROM answers WHERE token = ? AND expires >= ?", (token, time.time())
+            ).fetchone()
+        return valid_answers(json.loads(row[0])) if row else {}
+
+    def delete(self, token):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM answers WHERE token = ?", (token,))
+
+    def purge(self):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                removed = conn.execute("DELETE FROM answers WHERE expires < ?", (time.time(),)).rowcount
+            left = conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        return removed, left
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Base des questionnaires à reprendre.")
+    parser.add_argument("--path", default=RESUME_PATH, help="base SQLite (par défaut : BURNOUT_RESUME)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("purge", help="supprime les jetons expirés")
+    args = parser.parse_args(argv)
+    if not args.path:
+        parser.error("indiquez --path ou BURNOUT_RESUME")
+
+    removed, left = ResumeStore(args.path).purge()
+    print(f"{removed} jeton(s) expiré(s) supprimé(s), {left} restant(s)")
+
+
+RESUME = ResumeStore()
+
+if __name__ == "__main__":
+    main()
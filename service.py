@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import json
+import logging
+
+import numpy as np
+
+from advice import ADVICE, GENRE_AUTRE
+from metrics import METRICS
+from model import BANDS, get_model
+from questions import ENCODER, QUESTIONS
+from shadow import SHADOW
+
+# --- SERVICE DE SCORING HTTP (SANS INTERFACE) ---
+# Petit serveur HTTP/1.1 asyncio (bibliothèque standard uniquement) qui accepte les
+# mêmes réponses que le questionnaire et renvoie probabilité, bande de risque et
+# conseils affichés par l'application pour cette bande. Les requêtes concurrentes sont
+# regroupées par un micro-batcher en un seul appel de scoring vectorisé par tick.
+#
+#   python service.py --port 8502
+#   curl -s localhost:8502/score -d '{"genre": "Femme", "age": 40, ...}'
+
+logger = logging.getLogger("burnout.service")
+
+MAX_BATCH = 512
+TICK_MS = 1.0
+MAX_BODY = 64 * 1024
+
+
+class InvalidAnswers(ValueError):
+    def __init__(self, status, errors):
+        super().__init__("; ".join(errors))
+        self.status = status
+        self.errors = errors
+
+
+def validate(payload):
+    # Vérifie les réponses contre les options du questionnaire et renvoie (indices, valeurs numériques)
+    if not isinstance(payload, dict):
+        raise InvalidAnswers(400, ["le corps doit être un objet JSON {clé de question: réponse}"])
+    answers = payload.get("answers", payload)
+    if not isinstance(answers, dict):
+        raise InvalidAnswers(400, ["« answers » doit être un objet JSON {clé de question: réponse}"])
+
+    errors = []
+    for q in QUESTIONS:
+        key = q["key"]
+        if key not in answers:
+            errors.append(f"{key} : réponse absente")
+        elif "options" in q:
+            # Listes et objets JSON ne sont pas hachables : jamais une option valide
+            if isinstance(answers[key], (list, dict)) or answers[key] not in q["options"]:
+                errors.append(f"{key} : option inconnue {answers[key]!r}")
+        elif isinstance(answers[key], bool) or not isinstance(answers[key], (int, float)) \
+                or not q["min"] <= answers[key] <= q["max"]:
+            errors.append(f"{key} : valeur attendue entre {q['min']} et {q['max']}")
+    if errors:
+        raise InvalidAnswers(422, errors)
+
+    if answers["genre"] == GENRE_AUTRE:
+        raise InvalidAnswers(422, ["genre : profil non évaluable par le modèle actuel"])
+    idx = ENCODER.indices(answers)
+    missing = ENCODER.missing_questions(idx)
+    if missing:
+        raise InvalidAnswers(422, [f"réponse manquante : {q['name']}" for q in missing])
+    return idx, ENCODER.numeric_values(answers)
+
+
+class MicroBatcher:
+    # Accumule les profils reçus pendant un tick puis les score en un seul produit matriciel
+
+    def __init__(self, max_batch=MAX_BATCH, tick_ms=TICK_MS):
+        self.max_batch = max_batch
+        self.tick = tick_ms / 1000
+        self._queue = asyncio.Queue()
+        self._idx = np.empty((max_batch, len(ENCODER.categorical)), dtype=np.intp)
+        self._numeric = np.empty((max_batch, len(ENCODER.numeric)), dtype=np.float64)
+        self._X = np.empty((max_batch, len(ENCODER.features)), dtype=np.float64)
+        self.batches = 0
+        self.scored = 0
+
+    async def score(self, idx, numeric):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((idx, numeric, future))
+        return await future
+
+    async def run(self):
+        while True:
+            pending = [await self._queue.get()]
+            # On laisse les autres requêtes du tick arriver, puis on vide la file sans attendre
+            await asyncio.sleep(self.tick)
+            while len(pending) < self.max_batch and not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            try:
+                self._flush(pending)
+            except Exception as e:
+                # Un lot en échec ne bloque ni ses requêtes ni les suivantes
+                logger.exception("Échec du scoring d'un lot de %d profils", len(pending))
+                for _, _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _flush(self, pending):
+        n = len(pending)
+        clock = METRICS.stopwatch()
+        for i, (idx, numeric, _) in enumerate(pending):
+            self._idx[i] = idx
+            self._numeric[i] = numeric
+        model = get_model()
+        X = ENCODER.encode(self._idx[:n], self._numeric[:n], self._X[:n])
+        proba = model.probability(X)
+        bands = model.band(proba)
+        SHADOW.observe(model, X)
+        clock.lap("service_batch")
+        METRICS.count("service_scored", n)
+        for (_, _, future), p, b in zip(pending, proba.tolist(), bands.tolist()):
+            if not future.done():
+                _, title, text = ADVICE[b]
+                future.set_result({
+                    "probability": p,
+                    "band": str(BANDS[b]),
+                    "advice": {"title": title, "text": text},
+                    "model_version": model.version
+                })
+        self.batches += 1
+        self.scored += n
+
+
+async def _handle(reader, writer, batcher):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            parts = request_line.decode("latin-1").split(" ", 2)
+            if len(parts) != 3:
+                await _respond(writer, 400, {"error": "ligne de requête invalide"}, close=True)
+                break
+            method, path, _ = parts
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            # Longueur validée avant toute lecture : réponse 400 / 413 puis fermeture (corps non lu)
+            length = headers.get("content-length", "0")
+            if not (length.isascii() and length.isdigit()):
+                await _respond(writer, 400, {"error": "en-tête Content-Length invalide"}, close=True)
+                break
+            length = int(length)
+            if length > MAX_BODY:
+                await _respond(writer, 413, {"error": "corps de requête trop volumineux"}, close=True)
+                break
+            body = await reader.readexactly(length) if length else b""
+
+            if method == "GET" and path == "/health":
+                status, result = 200, {"status": "ok", "batches": batcher.batches, "scored": batcher.scored}
+            elif method == "POST" and path == "/score":
+                try:
+                    idx, numeric = validate(json.loads(body or b"null"))
+                    status, result = 200, await batcher.score(idx, numeric)
+                except json.JSONDecodeError:
+                    status, result = 400, {"error": "JSON invalide"}
+                except InvalidAnswers as e:
+                    status, result = e.status, {"errors": e.errors}
+                except Exception:
+                    logger.exception("Erreur de scoring")
+                    status, result = 500, {"error": "erreur interne de scoring"}
+            else:
+                status, result = 404, {"error": "route inconnue"}
+
+            close = headers.get("connection", "").lower() == "close"
+            await _respond(writer, status, result, close)
+            if close:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large", 422: "Unprocessable Entity",
+            500: "Internal Server Error"}
+
+
+async def _respond(writer, status, payload, close=False):
+    body = json.dumps(payload, ensure_ascii=False).encode()
+    head = (
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+    )
+    writer.write(head.encode() + body)
+    await writer.drain()
+
+
+async def serve(host, port, max_batch=MAX_BATCH, tick_ms=TICK_MS):
+    batcher = MicroBatcher(max_batch, tick_ms)
+    worker = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(lambda r, w: _handle(r, w, batcher), host, port)
+    logger.info("Service de scoring sur http://%s:%d (modèle %s)", host, port, get_model().version)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        worker.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service HTTP de scoring du risque de burn-out.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="profils maximum par appel de scoring")
+    parser.add_argument("--tick-ms", type=float, default=TICK_MS, help="fenêtre de regroupement des requêtes")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch, args.tick_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
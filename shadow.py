@@ -0,0 +1,212 @@
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from model import ARTIFACTS_DIR, BurnoutModel
+from registry import REGISTRY
+
+# --- SCORING FANTÔME MULTI-MODÈLES ---
+# Les versions listées dans <MODELS_DIR>/SHADOW (une par ligne) sont évaluées en silence
+# sur chaque soumission, à côté du modèle de production : les K vecteurs de coefficients
+# sont empilés en une matrice (variables, K) et un seul produit donne les K log-odds.
+# Seul le résultat de production est affiché. Probabilités, bandes et accords sont
+# traités par un thread d'arrière-plan (journal JSONL, résumé périodique) : le chemin
+# de rendu ne paie que le produit et un dépôt dans une file.
+#
+#   python shadow.py add logit-2024
+#   python shadow.py stats
+
+logger = logging.getLogger("burnout.shadow")
+
+SHADOW_FILE = "SHADOW"
+LOG_PATH = os.path.join(ARTIFACTS_DIR, "shadow.jsonl")
+CHECK_INTERVAL = 1.0
+QUEUE_SIZE = 10_000
+# Un résumé des accords est journalisé toutes les LOG_EVERY soumissions
+LOG_EVERY = 100
+
+
+class ShadowScorer:
+
+    def __init__(self, registry=REGISTRY, log_path=LOG_PATH, check_interval=CHECK_INTERVAL):
+        self.registry = registry
+        self.log_path = log_path
+        self.check_interval = check_interval
+        self._shadows = ()
+        self._signature = None
+        self._checked = float("-inf")
+        self._stack = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread = None
+        # Par version fantôme : soumissions, accords de bande et de classification, écarts de probabilité
+        self.stats = {}
+        self.dropped = 0
+
+    @property
+    def path(self):
+        return os.path.join(self.registry.models_dir, SHADOW_FILE)
+
+    def versions(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def shadows(self):
+        # Liste relue au plus une fois par intervalle, seulement si le fichier SHADOW a changé
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return self._shadows
+        with self._lock:
+            self._checked = now
+            try:
+                st = os.stat(self.path)
+                signature = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                signature = None
+            if signature != self._signature:
+                self._signature = signature
+                shadows = []
+                for version in self.versions():
+                    try:
+                        shadows.append(BurnoutModel.load(os.path.join(self.registry.models_dir, version)))
+                    except Exception:
+                        logger.exception("Modèle fantôme %s ignoré", version)
+                self._shadows = tuple(shadows)
+        return self._shadows
+
+    def _stacked(self, model):
+        shadows = self.shadows()
+        if not shadows:
+            return None
+        stack = self._stack
+        if stack is None or stack[0][0] is not model or stack[0][1:] != shadows:
+            models = (model,) + shadows
+            # Colonne 0 : production ; colonnes suivantes : modèles fantômes. Seuls les modèles
+            # logistiques sont empilés ; les autres backends (arbres) sont évalués séparément.
+            linear = [k for k, m in enumerate(models) if m.linear]
+            W = np.column_stack([models[k].coef for k in linear]) if linear else None
+            b = np.array([models[k].intercept for k in linear])
+            stack = self._stack = (models, linear, W, b)
+        return stack
+
+    def observe(self, model, X):
+        # X : vecteur d'une soumission ou matrice (n, variables). Un seul produit pour les K modèles logistiques.
+        stack = self._stacked(model)
+        if stack is None:
+            return
+        models, linear, W, b = stack
+        if len(linear) == len(models):
+            L = X @ W + b
+        else:
+            L = np.empty(np.shape(X)[:-1] + (len(models),))
+            if linear:
+                L[..., linear] = X @ W + b
+            for k, m in enumerate(models):
+                if not m.linear:
+                    L[..., k] = m.log_odds(X)
+        try:
+            self._queue.put_nowait((models, L))
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="shadow-scoring", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as log:
+            while True:
+                models, L = self._queue.get()
+                self._record(models, np.atleast_2d(L), log)
+                if self._queue.empty():
+                    log.flush()
+
+    def _record(self, models, L, log):
+        proba = [m.calibrate(L[:, k]) for k, m in enumerate(models)]
+        bands = [m.band(p) for m, p in zip(models, proba)]
+        production = models[0]
+        for k, m in enumerate(models[1:], start=1):
+            s = accumulate(self.stats, m.version, proba[0], bands[0], proba[k], bands[k])
+            if s["n"] % LOG_EVERY < len(L):
+                logger.info("Fantôme %s vs %s : %s", m.version, production.version, summary(s))
+        now = round(time.time(), 3)
+        for i in range(len(L)):
+            log.write(json.dumps({
+                "t": now,
+                "production": [production.version, round(float(proba[0][i]), 6), int(bands[0][i])],
+                "shadows": {m.version: [round(float(proba[k][i]), 6), int(bands[k][i])] for k, m in enumerate(models) if k},
+            }) + "\n")
+
+
+def accumulate(stats, key, proba, band, shadow_proba, shadow_band):
+    s = stats.setdefault(key, {"n": 0, "same_band": 0, "same_class": 0, "abs_diff": 0.0, "max_diff": 0.0})
+    diff = np.abs(np.asarray(shadow_proba) - proba)
+    s["n"] += diff.size
+    s["same_band"] += int(np.sum(shadow_band == band))
+    s["same_class"] += int(np.sum((np.asarray(shadow_band) > 0) == (np.asarray(band) > 0)))
+    s["abs_diff"] += float(diff.sum())
+    s["max_diff"] = max(s["max_diff"], float(diff.max()))
+    return s
+
+
+def summary(s):
+    n = max(s["n"], 1)
+    return (f"{s['n']} soumissions, bande identique {s['same_band'] / n:.1%}, "
+            f"classification identique {s['same_class'] / n:.1%}, "
+            f"écart moyen {s['abs_diff'] / n * 100:.2f} pts, max {s['max_diff'] * 100:.2f} pts")
+
+
+SHADOW = ShadowScorer()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Modèles évalués en fantôme à côté du modèle de production.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="ajoute une version aux modèles fantômes")
+    add.add_argument("version")
+    remove = sub.add_parser("remove", help="retire une version des modèles fantômes")
+    remove.add_argument("version")
+    sub.add_parser("stats", help="accords avec la production, d'après le journal")
+    args = parser.parse_args(argv)
+
+    versions = SHADOW.versions()
+    if args.command == "stats":
+        stats = {}
+        if os.path.exists(SHADOW.log_path):
+            with open(SHADOW.log_path, encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    production, (p, band) = record["production"][0], record["production"][1:]
+                    for version, (q, shadow_band) in record["shadows"].items():
+                        accumulate(stats, (version, production), p, band, q, shadow_band)
+        for (version, production), s in sorted(stats.items()):
+            print(f"{version} vs {production} : {summary(s)}")
+        return
+
+    if args.command == "add" and args.version not in versions:
+        BurnoutModel.load(os.path.join(REGISTRY.models_dir, args.version))
+        versions.append(args.version)
+    elif args.command == "remove":
+        versions = [v for v in versions if v != args.version]
+    os.makedirs(REGISTRY.models_dir, exist_ok=True)
+    tmp = f"{SHADOW.path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("".join(v + "\n" for v in versions))
+    os.replace(tmp, SHADOW.path)
+    print("Modèles fantômes : " + (", ".join(versions) or "aucun"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model import get_model
+from population import MARGINALS_PATH, load_marginals, numeric_weights, option_weights
+from questions import ENCODER
+
+# --- SIMULATION DE POPULATIONS SYNTHÉTIQUES ET SCÉNARIOS DE POLITIQUE ---
+# Génère des répondants fictifs à partir des fréquences de réponse (marges indépendantes,
+# artifacts/marginals.json) ou en rééchantillonnant les lignes d'un fichier de référence
+# (distribution jointe empirique), applique des scénarios sur les variables encodées et
+# compte les répondants par bande avec le modèle vectorisé. Les répondants sont répartis
+# en lots ; chaque lot a sa propre graine, dérivée de --seed : le résultat ne dépend pas
+# du nombre de processus.
+#
+#   python simulate.py --respondents 100000000 --workers 8 \
+#       --scenario "deconnexion:JOINEXT_reg=0" --scenario "prevenance:PREVIS=1" \
+#       --scenario "mixte:JOINEXT_reg=0,PREVIS=1@0.5"
+
+RESPONDENTS = 10_000_000
+SHARD_SIZE = 1_000_000
+BLOCK_SIZE = 250_000
+TABLE_SIZE = 1 << 16
+
+_model = None
+_sampler = None
+_scenarios = None
+
+
+class Scenario:
+    # « nom:VARIABLE=valeur,VARIABLE=valeur@part » : fixe des variables encodées pour une
+    # part de la population (par défaut toute la population)
+
+    def __init__(self, spec, model):
+        name, _, rest = spec.partition(":")
+        rest, _, share = rest.partition("@")
+        self.name = name.strip()
+        self.share = float(share) if share else 1.0
+        self.columns, self.values = [], []
+        for item in rest.split(","):
+            column, _, value = item.partition("=")
+            column = column.strip()
+            if column not in model.column_index:
+                raise ValueError(f"scénario {self.name} : variable inconnue {column!r}")
+            self.columns.append(model.column_index[column])
+            self.values.append(float(value))
+        if not self.name or not 0 <= self.share <= 1:
+            raise ValueError(f"scénario invalide : {spec!r}")
+
+    def log_odds(self, model, X, L, rng):
+        selected = rng.random(len(L)) < self.share if self.share < 1 else None
+        if not model.linear:
+            # Modèle non linéaire (arbres) : profils modifiés re-scorés
+            Xs = X.copy()
+            if selected is None:
+                Xs[:, self.columns] = self.values
+            else:
+                Xs[np.ix_(selected, self.columns)] = self.values
+            return model.log_odds(Xs)
+        # Seules les colonnes modifiées changent le score : L + Σ coef_j (v_j − x_j), sans re-scorer X
+        delta = (np.array(self.values) - X[:, self.columns]) @ model.coef[self.columns]
+        if selected is not None:
+            delta *= selected
+        return L + delta
+
+
+class MarginalSampler:
+    # Réponses tirées indépendamment, question par question, selon les fréquences observées.
+    # Tirage par table : un entier aléatoire sur 16 bits indexe une table de 65 536 options
+    # (inverse de la fonction de répartition), soit un simple gather au lieu d'une recherche.
+
+    def __init__(self, marginals):
+        self.tables = [_inverse_cdf(w) for w in option_weights(marginals)]
+        self.numeric = [(values, _inverse_cdf(w)) for values, w in numeric_weights(marginals)]
+
+    def sample(self, rng, n):
+        u = rng.integers(0, TABLE_SIZE, (len(self.tables) + len(self.numeric), n), dtype=np.uint16)
+        idx = np.empty((n, len(self.tables)), dtype=np.intp)
+        for i, table in enumerate(self.tables):
+            idx[:, i] = table[u[i]]
+        numeric = np.empty((n, len(self.numeric)))
+        for j, (values, table) in enumerate(self.numeric):
+            numeric[:, j] = values[table[u[len(self.tables) + j]]]
+        return idx, numeric
+
+
+def _inverse_cdf(weights):
+    # Probabilités arrondies à 1/65 536 près ; les options de poids nul ne sont jamais tirées
+    cdf = np.cumsum(weights)
+    table = np.searchsorted(cdf, (np.arange(TABLE_SIZE) + 0.5) / TABLE_SIZE, side="right")
+    return np.minimum(table, len(cdf) - 1).astype(np.uint8)
+
+
+class JointSampler:
+    # Lignes complètes d'un fichier de référence, rééchantillonnées avec remise :
+    # conserve les corrélations entre questions
+
+    def __init__(self, idx, numeric):
+        complete = ~(ENCODER.missing[ENCODER.offsets + idx].any(axis=1) | np.isnan(numeric).any(axis=1))
+        self.idx, self.numeric = idx[complete], numeric[complete]
+        if not len(self.idx):
+            raise ValueError("aucune ligne complète dans le fichier de référence")
+
+    def sample(self, rng, n):
+        rows = rng.integers(0, len(self.idx), n)
+        return self.idx[rows], self.numeric[rows]
+
+
+def _init_worker(model, sampler, scenarios):
+    global _model, _sampler, _scenarios
+    _model, _sampler, _scenarios = model, sampler, scenarios
+
+
+def _shard(seed, n, block_size=BLOCK_SIZE):
+    # Effectifs par (scénario, bande) et somme des probabilités ; ligne 0 : situation actuelle
+    rng = np.random.default_rng(seed)
+    n_bands = len(_model.thresholds) + 1
+    counts = np.zeros((len(_scenarios) + 1, n_bands), dtype=np.int64)
+    proba_sum = np.zeros(len(_scenarios) + 1)
+    for start in range(0, n, block_size):
+        idx, numeric = _sampler.sample(rng, min(block_size, n - start))
+        X = ENCODER.encode(idx, numeric)
+        L = _model.log_odds(X)
+        for s, scenario in enumerate([None] + _scenarios):
+            Ls = L if scenario is None else scenario.log_odds(_model, X, L, rng)
+            proba = _model.calibrate(Ls)
+            counts[s] += np.bincount(_model.band(proba), minlength=n_bands)
+            proba_sum[s] += proba.sum()
+    return counts, proba_sum
+
+
+def simulate(model, sampler, scenarios, respondents=RESPONDENTS, seed=0, workers=None, shard_size=SHARD_SIZE):
+    n_shards = -(-respondents // shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_shards)
+    sizes = [min(shard_size, respondents - k * shard_size) for k in range(n_shards)]
+    counts = np.zeros((len(scenarios) + 1, len(model.thresholds) + 1), dtype=np.int64)
+    proba_sum = np.zeros(len(scenarios) + 1)
+    with ProcessPoolExecutor(workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(model, sampler, scenarios)) as pool:
+        for c, p in pool.map(_shard, seeds, sizes):
+            counts += c
+            proba_sum += p
+    return counts, proba_sum
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simule une population synthétique et l'effet de scénarios de politique.")
+    parser.add_argument("--respondents", type=int, default=RESPONDENTS, help="nombre de répondants simulés")
+    parser.add_argument("--scenario", action="append", default=[],
+                        help="« nom:VARIABLE=valeur,...@part », par exemple deconnexion:JOINEXT_reg=0")
+    parser.add_argument("--marginals", default=MARGINALS_PATH, help="fréquences de réponse (population.py marginals)")
+    parser.add_argument("--joint", help="fichier de réponses de référence à rééchantillonner (distribution jointe)")
+    parser.add_argument("--workers", type=int, help="processus (par défaut : nombre de cœurs)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="répondants par lot (une graine par lot)")
+    parser.add_argument("--json", help="écrit aussi les résultats en JSON")
+    args = parser.parse_args(argv)
+
+    model = get_model()
+    try:
+        scenarios = [Scenario(spec, model) for spec in args.scenario]
+        if args.joint:
+            from batch import read_chunks
+
+            frames = list(read_chunks(args.joint))
+            sampler = JointSampler(np.concatenate([ENCODER.frame_indices(df) for df in frames]),
+                                   np.concatenate([ENCODER.frame_numeric(df) for df in frames]))
+        else:
+            marginals = load_marginals(args.marginals)
+            if marginals is None:
+                raise ValueError(f"{args.marginals} introuvable : lancez d'abord population.py marginals, ou utilisez --joint")
+            sampler = MarginalSampler(marginals)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    counts, proba_sum = simulate(model, sampler, scenarios, args.respondents, args.seed, args.workers, args.shard_size)
+    elapsed = time.perf_counter() - start
+
+    low, high = model.thresholds.tolist()
+    rows = []
+    for name, c, p in zip(["actuel"] + [s.name for s in scenarios], counts, proba_sum):
+        n = c.sum()
+        rows.append({"scenario": name, "above_low": c[1:].sum() / n, "above_high": c[2:].sum() / n, "mean": p / n})
+    print(f"{'scénario':<16} {f'≥ {low:.2f}':>9} {'Δ':>7} {f'≥ {high:.2f}':>9} {'Δ':>7} {'moyenne':>9}")
+    for r in rows:
+        print(f"{r['scenario']:<16} {r['above_low']:9.2%} {(r['above_low'] - rows[0]['above_low']) * 100:+7.2f}"
+              f" {r['above_high']:9.2%} {(r['above_high'] - rows[0]['above_high']) * 100:+7.2f} {r['mean']:9.2%}")
+    print(f"{args.respondents} répondants simulés en {elapsed:.1f} s (modèle {model.version})", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"model_version": model.version, "respondents": args.respondents, "seed": args.seed,
+                       "thresholds": [low, high], "scenarios": args.scenario, "results": rows}, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
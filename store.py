@@ -0,0 +1,283 @@
+import argparse
+import atexit
+import datetime
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from model import ARTIFACTS_DIR, BANDS
+from questions import ENCODER
+
+# --- STOCKAGE DES RÉSULTATS (NON BLOQUANT) ---
+# Base SQLite locale en mode WAL, en ajout seul, pour le suivi agrégé en santé au travail.
+# Seules des données anonymisées sont conservées : jour (sans heure), version du modèle,
+# probabilité, bande, codes des réponses (indices d'options) et âge arrondi à 5 ans.
+# L'interface dépose chaque résultat dans une file bornée (sans jamais attendre) ; un
+# thread d'écriture la vide par lots, une transaction par lot, et compacte périodiquement
+# (checkpoint du WAL et libération des pages vides).
+#
+#   python store.py summary
+#   python store.py export resultats.parquet
+#   python store.py purge --before 2025-01-01
+
+logger = logging.getLogger("burnout.store")
+
+# Chemin de la base ; BURNOUT_RESULTS="" désactive l'enregistrement
+RESULTS_PATH = os.environ.get("BURNOUT_RESULTS", os.path.join(ARTIFACTS_DIR, "results.sqlite"))
+QUEUE_SIZE = 10_000
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+COMPACT_INTERVAL = 600.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    day TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    probability REAL NOT NULL,
+    band INTEGER NOT NULL,
+    codes BLOB NOT NULL,
+    age_group INTEGER,
+    codebook_id INTEGER REFERENCES codebooks (id)
+);
+CREATE TABLE IF NOT EXISTS codebooks (id INTEGER PRIMARY KEY, codebook TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def _codebook():
+    # Signification des codes : questions dans l'ordre des octets, libellés des options par indice
+    return json.dumps([
+        {"key": q["key"], "options": list(ENCODER.option_index[j])}
+        for j, q in enumerate(ENCODER.categorical)
+    ], ensure_ascii=False)
+
+
+def _codebook_id(conn, codebook):
+    # Chaque version du codebook est conservée une fois ; les lignes portent l'identifiant
+    # de celle avec laquelle leurs codes ont été écrits
+    conn.execute("INSERT OR IGNORE INTO codebooks (codebook) VALUES (?)", (codebook,))
+    return conn.execute("SELECT id FROM codebooks WHERE codebook = ?", (codebook,)).fetchone()[0]
+
+
+def connect(path):
+    # Connexion d'écriture (thread d'écriture, purge, compactage) : crée le schéma si besoin.
+    # auto_vacuum n'a d'effet qu'avant la création de la première table ; une base créée sans
+    # lui n'est convertie que par la commande compact (VACUUM complet, verrou exclusif).
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    # Bases antérieures au versionnement : un seul codebook dans meta, appliqué aux lignes existantes
+    if "codebook_id" not in {row[1] for row in conn.execute("PRAGMA table_info(results)")}:
+        conn.execute("ALTER TABLE results ADD COLUMN codebook_id INTEGER REFERENCES codebooks (id)")
+    legacy = conn.execute("SELECT value FROM meta WHERE key = 'codebook'").fetchone()
+    if legacy is not None:
+        conn.execute("UPDATE results SET codebook_id = ? WHERE codebook_id IS NULL", (_codebook_id(conn, legacy[0]),))
+        conn.execute("DELETE FROM meta WHERE key = 'codebook'")
+    conn.commit()
+    return conn
+
+
+def connect_readonly(path):
+    # Lecture seule (summary, export) : ni schéma, ni codebook, ni conversion
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Base de résultats introuvable : {path}")
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+
+
+# Position de l'âge parmi les réponses numériques
+AGE = next((j for j, q in enumerate(ENCODER.numeric) if q["columns"] == ["AGE"]), None)
+
+
+def record(model, idx, numeric, proba, band):
+    # Ligne anonymisée : ni horodatage précis, ni identifiant de session
+    age = numeric[AGE] if AGE is not None else np.nan
+    return (
+        datetime.date.today().isoformat(),
+        model.version,
+        float(proba),
+        int(band),
+        np.asarray(idx, dtype=np.uint8).tobytes(),
+        None if np.isnan(age) else int(age) // 5 * 5,
+    )
+
+
+class ResultStore:
+
+    def __init__(self, path=RESULTS_PATH, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, compact_interval=COMPACT_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+
+    def submit(self, row):
+        # Appelé depuis le thread de rendu : ne bloque jamais (ligne perdue si la file est pleine)
+        if not self.path:
+            return
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._thread = threading.Thread(target=self._run, name="results-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        conn = connect(self.path)
+        with conn:
+            codebook_id = _codebook_id(conn, _codebook())
+        last_compact = time.monotonic()
+        stop = False
+        while not stop:
+            rows = []
+            try:
+                row = self._queue.get(timeout=self.flush_interval)
+                # Regroupe ce qui est déjà en file, sans attendre davantage ; arrêt à la sentinelle
+                while row is not None:
+                    rows.append(row)
+                    if len(rows) == self.batch_size:
+                        break
+                    row = self._queue.get_nowait()
+                stop = row is None
+            except queue.Empty:
+                pass
+            if rows:
+                try:
+                    with conn:
+                        conn.executemany("INSERT INTO results (day, model_version, probability, band, codes, age_group, "
+                                         "codebook_id) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                         [r + (codebook_id,) for r in rows])
+                    self.written += len(rows)
+                    self.batches += 1
+                except sqlite3.Error:
+                    logger.exception("Écriture de %d résultats impossible", len(rows))
+            if time.monotonic() - last_compact >= self.compact_interval:
+                compact(conn)
+                last_compact = time.monotonic()
+        conn.close()
+
+    def close(self):
+        # Vide la file puis arrête le thread d'écriture (appelé à la sortie du processus)
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+def compact(conn):
+    # Rend au système les pages libérées puis replie le WAL dans la base (la troncature du
+    # fichier n'a lieu qu'au checkpoint). incremental_vacuum libère une page par pas
+    # d'exécution : executescript le mène à son terme, execute s'arrêterait au premier.
+    try:
+        conn.executescript("PRAGMA incremental_vacuum;")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except sqlite3.Error:
+        logger.exception("Compactage impossible")
+
+
+def convert(conn):
+    # Conversion unique d'une base créée sans auto_vacuum : réécrit tout le fichier sous
+    # verrou exclusif, à lancer explicitement (commande compact). Renvoie True si convertie.
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return False
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+
+def decode(conn):
+    # Résultats avec les codes traduits en libellés, chaque ligne selon son propre codebook
+    import pandas as pd
+
+    codebooks = dict(conn.execute("SELECT id, codebook FROM codebooks"))
+    df = pd.read_sql_query("SELECT * FROM results", conn)
+    codes = df.pop("codes")
+    for codebook_id, rows in df.groupby("codebook_id", dropna=False).groups.items():
+        if codebook_id not in codebooks:
+            logger.warning("%d résultat(s) sans codebook connu : réponses non décodées", len(rows))
+            continue
+        codebook = json.loads(codebooks[codebook_id])
+        block = np.frombuffer(b"".join(codes[rows]), dtype=np.uint8).reshape(len(rows), len(codebook))
+        for j, question in enumerate(codebook):
+            labels = np.array(question["options"] + [None], dtype=object)
+            df.loc[rows, question["key"]] = labels[np.minimum(block[:, j], len(question["options"]))]
+    df["band"] = BANDS[df["band"].to_numpy()]
+    return df
+
+
+def purge(conn, before):
+    # Durée de conservation : supprime les résultats antérieurs au jour donné puis compacte
+    with conn:
+        removed = conn.execute("DELETE FROM results WHERE day < ?", (before,)).rowcount
+    compact(conn)
+    return removed
+
+
+STORE = ResultStore()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Résultats anonymisés enregistrés par l'application.")
+    parser.add_argument("--db", default=RESULTS_PATH, help="base SQLite des résultats")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("summary", help="effectifs par version du modèle et par bande")
+    export = sub.add_parser("export", help="exporte les résultats avec les codes décodés (CSV ou Parquet)")
+    export.add_argument("output")
+    sub.add_parser("compact", help="checkpoint du WAL et libération des pages vides (convertit une ancienne base)")
+    p = sub.add_parser("purge", help="supprime les résultats antérieurs à un jour, puis compacte")
+    p.add_argument("--before", required=True, type=datetime.date.fromisoformat, help="jour AAAA-MM-JJ (exclu)")
+    args = parser.parse_args(argv)
+
+    if args.command in ("summary", "export"):
+        if not os.path.exists(args.db):
+            parser.error(f"base de résultats introuvable : {args.db}")
+        conn = connect_readonly(args.db)
+    else:
+        conn = connect(args.db)
+    if args.command == "summary":
+        rows = conn.execute("SELECT model_version, band, COUNT(*), AVG(probability) FROM results "
+                            "GROUP BY model_version, band ORDER BY model_version, band").fetchall()
+        for version, band, n, mean in rows:
+            print(f"{version:<24} {BANDS[band]:<11} {n:>9}  proba moyenne {mean * 100:.1f} %")
+    elif args.command == "export":
+        df = decode(conn)
+        if args.output.endswith((".parquet", ".pq")):
+            df.to_parquet(args.output, index=False)
+        else:
+            df.to_csv(args.output, index=False)
+        print(f"{len(df)} résultats -> {args.output}")
+    elif args.command == "purge":
+        print(f"{purge(conn, args.before.isoformat())} résultat(s) supprimé(s)")
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            print("Base sans auto_vacuum : lancez « store.py compact » pour réduire le fichier")
+    else:
+        if convert(conn):
+            print("Base convertie en auto_vacuum incrémental")
+        compact(conn)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
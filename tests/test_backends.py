@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from benchmarks.common import naive_log_odds, random_profiles, synthetic_ensemble
+from model import FEATURES, BurnoutModel, TreeEnsembleBackend
+from questions import ENCODER
+
+# Arbres de profondeurs inégales, variables nommées ou « f<j> », nœuds « yes » déclarés après « no »
+IRREGULAR = {
+    "features": FEATURES,
+    "base_margin": -0.7,
+    "trees": [
+        {"nodeid": 0, "split": "TENSION2_reg", "split_condition": 0.5, "yes": 2, "no": 1, "children": [
+            {"nodeid": 1, "split": "AGE", "split_condition": 40.5, "yes": 3, "no": 4, "children": [
+                {"nodeid": 3, "leaf": 0.25},
+                {"nodeid": 4, "split": f"f{FEATURES.index('PREVIS')}", "split_condition": 2.5, "yes": 5, "no": 6,
+                 "children": [{"nodeid": 5, "leaf": 0.1}, {"nodeid": 6, "leaf": 0.6}]},
+            ]},
+            {"nodeid": 2, "leaf": -0.2},
+        ]},
+        {"nodeid": 0, "leaf": 0.05},
+        {"nodeid": 0, "split": "revmensc_tranche_> 3000", "split_condition": 0.5, "yes": 1, "no": 2, "children": [
+            {"nodeid": 1, "leaf": 0.3}, {"nodeid": 2, "leaf": -0.4},
+        ]},
+    ],
+}
+
+
+@pytest.mark.parametrize("dump", [
+    IRREGULAR,
+    synthetic_ensemble(50, 4, seed=1),
+    synthetic_ensemble(20, 7, seed=2),
+], ids=["irregular", "depth4", "depth7"])
+def test_compiled_trees_match_naive_walk(dump):
+    backend = TreeEnsembleBackend(dump)
+    X = ENCODER.encode(*random_profiles(500, seed=3))
+    expected = np.array([naive_log_odds(dump, x) for x in X])
+    np.testing.assert_allclose(backend.log_odds(X), expected, rtol=0, atol=1e-12)
+    for x, e in zip(X[:50], expected):
+        assert backend.log_odds_one(x) == pytest.approx(e, abs=1e-12)
+
+
+def test_blocks_do_not_change_scores(monkeypatch):
+    dump = synthetic_ensemble(30, 5, seed=4)
+    backend = TreeEnsembleBackend(dump)
+    X = ENCODER.encode(*random_profiles(300, seed=5))
+    whole = backend.log_odds(X)
+    monkeypatch.setattr("model.TREE_BLOCK", 7 * len(dump["trees"]))
+    np.testing.assert_array_equal(backend.log_odds(X), whole)
+
+
+def test_missing_answer_gives_missing_score():
+    model = BurnoutModel(TreeEnsembleBackend(IRREGULAR))
+    X = ENCODER.encode(*random_profiles(4, seed=6))
+    X[1, FEATURES.index("sexe")] = np.nan
+    scores = model.log_odds(X)
+    assert np.isnan(scores[1]) and not np.isnan(scores[[0, 2, 3]]).any()
+    assert np.isnan(model.log_odds_one(X[1]))
+
+
+def test_unknown_feature_is_rejected():
+    dump = {"features": FEATURES, "trees": [
+        {"nodeid": 0, "split": "INCONNUE", "split_condition": 0.5, "yes": 1, "no": 2,
+         "children": [{"nodeid": 1, "leaf": 0.1}, {"nodeid": 2, "leaf": 0.2}]},
+    ]}
+    with pytest.raises(ValueError):
+        TreeEnsembleBackend(dump)
@@ -0,0 +1,100 @@
+import random
+
+import numpy as np
+
+from model import FEATURES
+from questions import ENCODER
+
+NSP = "Je ne sais pas / Je préfère ne pas répondre"
+FREQUENCE = ["Toujours", "Souvent", "Parfois", "Jamais"]
+OUI_NON = ["Oui", "Non", NSP]
+
+# Options et recodages du questionnaire d'origine (branches if/elif de la première version de app.py)
+OPTIONS = {
+    "genre": ["Femme", "Homme", "Autre/Ne souhaite pas répondre"],
+    "diplome": ["Aucun diplôme ou primaire", "CAP / BEP / Bac", "Bac +2 (BTS, DUT, etc.)",
+                "Bac +3 ou plus (Licence, Master...)"],
+    "type_emploi": ["1 - Fonctionnaire titulaire", "2 - Fonctionnaire non titulaire", "3 - Salarié permanent CDI",
+                    "4 - Salarié temporaire ou CDD", "5 - Intérimaire", "6 - Indépendant / à son compte",
+                    "7 - Aide familiale"],
+    "revenu": ["Je préfère ne pas répondre", "≤ 1350", "1351–1700", "1701–2250", "2251–3000", "> 3000"],
+    "cvfvp": ["Très bien", "Bien", "Pas très bien", "Pas bien du tout", NSP],
+    "previs": ["Au moins un mois à l’avance", "Au moins une semaine à l’avance", "La veille",
+               "Le jour même ou pas du tout", NSP],
+    "initiat": FREQUENCE + [NSP],
+    "idee": FREQUENCE + [NSP],
+    "quanti": FREQUENCE + [NSP],
+    "bienetr1": ["Plutôt bien", "Plutôt mal", NSP],
+    "tension2": ["Oui", "Non", "Sans objet (pas de supérieur hiérarchique)", NSP],
+    "rp1": OUI_NON,
+    "acchef": FREQUENCE + [NSP],
+    "aidcoll": ["Oui", "Non", "Sans objet / Je ne sais pas / Je préfère ne pas répondre"],
+    "infoconf": FREQUENCE + ["Sans objet / Je ne sais pas / Je préfère ne pas répondre"],
+    "rp4b": OUI_NON,
+    "joinext": ["Oui", "Non", "Sans objet / Je travaille seul·e / Je ne sais pas / Je préfère ne pas répondre"],
+    "rpb1e": OUI_NON,
+    "rpb1h": OUI_NON,
+    "rpb1j": OUI_NON,
+    "rpb5e": FREQUENCE + [NSP],
+}
+
+
+def baseline(a):
+    def binary(value, yes, no):
+        return 1 if value in yes else 0 if value in no else np.nan
+
+    revenu = {f"revmensc_tranche_{r}": int(a["revenu"] == r) for r in OPTIONS["revenu"][2:]}
+    row = {
+        "sexe": {"Femme": 1, "Homme": 0}.get(a["genre"], np.nan),
+        "AGE": a["age"],
+        "CVFVP_reg": binary(a["cvfvp"], ["Très bien", "Bien"], ["Pas très bien", "Pas bien du tout"]),
+        "BIENETR1_reg": binary(a["bienetr1"], ["Plutôt bien"], ["Plutôt mal"]),
+        "RP1_reg": binary(a["rp1"], ["Oui"], ["Non"]),
+        "RP4B_reg": binary(a["rp4b"], ["Oui"], ["Non"]),
+        "RPB1E_b": binary(a["rpb1e"], ["Oui"], ["Non"]),
+        "RPB1J_b": binary(a["rpb1j"], ["Oui"], ["Non"]),
+        "RPB5E_b": binary(a["rpb5e"], ["Toujours", "Souvent"], ["Parfois", "Jamais"]),
+        "AIDCOLL_reg": binary(a["aidcoll"], ["Oui"], ["Non"]),
+        "JOINEXT_reg": binary(a["joinext"], ["Oui"], ["Non"]),
+        "INFOCONF_reg": dict(zip(FREQUENCE, [3, 2, 1, 0])).get(a["infoconf"], np.nan),
+        "ACCHEF_reg": dict(zip(FREQUENCE, [3, 2, 1, 0])).get(a["acchef"], np.nan),
+        "niv_diplome_reg": OPTIONS["diplome"].index(a["diplome"]),
+        "PREVIS": dict(zip(OPTIONS["previs"][:4], [1, 2, 3, 4])).get(a["previs"], np.nan),
+        "INITIAT_reg": dict(zip(FREQUENCE, [1, 2, 3, 4])).get(a["initiat"], np.nan),
+        "IDEE_reg": binary(a["idee"], ["Toujours", "Souvent"], ["Parfois", "Jamais"]),
+        "QUANTI_reg": binary(a["quanti"], ["Toujours", "Souvent"], ["Parfois", "Jamais"]),
+        "TENSION2_reg": binary(a["tension2"], ["Oui"], ["Non"]),
+        "TYPEMPLOI": int(a["type_emploi"].split(" - ")[0]),
+        **revenu,
+    }
+    return np.array([row[f] for f in FEATURES], dtype=np.float64)
+
+
+def random_answers(rnd):
+    answers = {key: rnd.choice(options) for key, options in OPTIONS.items()}
+    answers["age"] = rnd.randint(18, 64)
+    return answers
+
+
+def test_encoding_matches_baseline_branches():
+    rnd = random.Random(0)
+    for _ in range(500):
+        answers = random_answers(rnd)
+        np.testing.assert_array_equal(ENCODER.encode_answers(answers), baseline(answers), err_msg=str(answers))
+
+
+def test_every_option_matches_baseline():
+    # Chaque option de chaque question, les autres réponses fixées
+    reference = random_answers(random.Random(0))
+    for key, options in OPTIONS.items():
+        for option in options:
+            answers = dict(reference, **{key: option})
+            np.testing.assert_array_equal(ENCODER.encode_answers(answers), baseline(answers), err_msg=f"{key}={option}")
+
+
+def test_batch_encoding_matches_single_profiles():
+    rnd = random.Random(1)
+    profiles = [random_answers(rnd) for _ in range(50)]
+    idx = np.stack([ENCODER.indices(a) for a in profiles])
+    numeric = np.stack([ENCODER.numeric_values(a) for a in profiles])
+    np.testing.assert_array_equal(ENCODER.encode(idx, numeric), np.stack([baseline(a) for a in profiles]))
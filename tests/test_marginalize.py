@@ -0,0 +1,83 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+import marginalize
+from marginalize import expected_risk
+from model import builtin_model
+from questions import ENCODER, NSP
+
+SKIPPED = ["tension2", "previs", "acchef", "bienetr1", "rp1"]
+
+
+def marginals(seed=0):
+    # Effectifs arbitraires, y compris pour les options « manquantes » (ignorées par le calcul)
+    rnd = random.Random(seed)
+    return {
+        "questions": {q["key"]: {label: rnd.randint(1, 100) for label in q["options"]} for q in ENCODER.categorical},
+        "numeric": {},
+    }
+
+
+def answered(skipped):
+    answers = {q["key"]: next(iter(q["options"])) for q in ENCODER.categorical}
+    answers.update({key: NSP for key in skipped}, age=45)
+    return answers
+
+
+def complete(key, label):
+    i = ENCODER.position[key]
+    return not ENCODER.missing[ENCODER.offsets[i] + ENCODER.option_index[i][label]]
+
+
+def brute_force(model, answers, skipped, marginals):
+    # Somme explicite sur toutes les combinaisons de réponses valides aux questions sautées
+    choices = []
+    for key in skipped:
+        valid = {label: n for label, n in marginals["questions"][key].items() if complete(key, label)}
+        total = sum(valid.values())
+        choices.append([(label, n / total) for label, n in valid.items()])
+    expected = log_odds = 0.0
+    for combination in itertools.product(*choices):
+        x = ENCODER.encode_answers(dict(answers, **{key: label for key, (label, _) in zip(skipped, combination)}))
+        w = np.prod([p for _, p in combination])
+        expected += w * model.probability_one(x)
+        log_odds += w * model.log_odds_one(x)
+    return expected, log_odds, int(np.prod([len(c) for c in choices]))
+
+
+@pytest.mark.parametrize("n_skipped", [1, 2, len(SKIPPED)])
+def test_exact_marginalization_matches_enumeration(n_skipped):
+    model, m = builtin_model(), marginals()
+    skipped = SKIPPED[:n_skipped]
+    answers = answered(skipped)
+    result = expected_risk(model, ENCODER.indices(answers), ENCODER.numeric_values(answers), m)
+    expected, log_odds, profiles = brute_force(model, answers, skipped, m)
+    assert result["method"] == "exacte"
+    assert result["profiles"] == profiles
+    assert result["expected"] == pytest.approx(expected, rel=1e-12)
+    assert result["log_odds"] == pytest.approx(log_odds, rel=1e-12)
+    assert {q["key"] for q in result["missing"]} == set(skipped)
+    assert result["low"] <= result["expected"] <= result["high"]
+
+
+def test_monte_carlo_approaches_enumeration(monkeypatch):
+    model, m = builtin_model(), marginals(1)
+    answers = answered(SKIPPED)
+    expected, _, _ = brute_force(model, answers, SKIPPED, m)
+    monkeypatch.setattr(marginalize, "EXACT_LIMIT", 0)
+    monkeypatch.setattr(marginalize, "SAMPLES", 50_000)
+    result = expected_risk(model, ENCODER.indices(answers), ENCODER.numeric_values(answers), m)
+    assert result["method"] == "monte_carlo"
+    assert result["expected"] == pytest.approx(expected, abs=3e-3)
+
+
+def test_complete_profile_is_its_own_score():
+    model = builtin_model()
+    answers = answered([])
+    x = ENCODER.encode_answers(answers)
+    result = expected_risk(model, ENCODER.indices(answers), ENCODER.numeric_values(answers), marginals())
+    assert result["profiles"] == 1
+    assert result["expected"] == pytest.approx(model.probability_one(x), rel=1e-12)
@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+import pytest
+
+import service
+from questions import QUESTIONS
+
+ANSWERS = {q["key"]: list(q["options"])[0] if "options" in q else 40 for q in QUESTIONS}
+
+
+async def exchange(raw):
+    # Envoie une requête brute à un serveur local et renvoie (statut, corps JSON)
+    batcher = service.MicroBatcher(service.MAX_BATCH, service.TICK_MS)
+    worker = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(lambda r, w: service._handle(r, w, batcher), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), 10)
+        writer.close()
+    finally:
+        server.close()
+        worker.cancel()
+    head, _, body = data.partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), json.loads(body)
+
+
+def post(body, length=None):
+    length = len(body) if length is None else length
+    return f"POST /score HTTP/1.1\r\nContent-Length: {length}\r\nConnection: close\r\n\r\n".encode() + body
+
+
+def test_valid_answers_are_scored():
+    status, result = asyncio.run(exchange(post(json.dumps(ANSWERS).encode())))
+    assert status == 200
+    assert 0 <= result["probability"] <= 1
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1e3", "²", ""])
+def test_invalid_content_length_gets_400(length):
+    status, result = asyncio.run(exchange(post(b"{}", length)))
+    assert status == 400
+    assert "Content-Length" in result["error"]
+
+
+def test_oversized_body_gets_413():
+    status, _ = asyncio.run(exchange(post(b"{}", service.MAX_BODY + 1)))
+    assert status == 413
+
+
+def test_malformed_request_line_gets_400():
+    status, _ = asyncio.run(exchange(b"GARBAGE\r\n\r\n"))
+    assert status == 400
+
+
+@pytest.mark.parametrize("body, expected", [
+    ({"answers": []}, 400),
+    ({"answers": "x"}, 400),
+    (dict(ANSWERS, genre=["Femme"]), 422),
+    (dict(ANSWERS, genre="Inconnu"), 422),
+])
+def test_malformed_answers_are_rejected(body, expected):
+    status, _ = asyncio.run(exchange(post(json.dumps(body).encode())))
+    assert status == expected
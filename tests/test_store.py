@@ -0,0 +1,133 @@
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pytest
+
+import store
+from model import builtin_model
+from questions import ENCODER
+from store import ResultStore, connect, connect_readonly, convert, decode, main, purge, record
+
+
+def test_new_database_uses_incremental_auto_vacuum(tmp_path):
+    conn = connect(str(tmp_path / "results.sqlite"))
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def test_existing_database_is_converted(tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    old = sqlite3.connect(path)
+    old.execute("PRAGMA journal_mode=WAL")
+    old.execute("CREATE TABLE t (x)")
+    old.commit()
+    old.close()
+    conn = connect(path)
+    # L'ouverture ne réécrit jamais le fichier : seule la conversion explicite le fait
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+    assert convert(conn)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert not convert(conn)
+
+
+def test_file_shrinks_after_purge(tmp_path):
+    path = str(tmp_path / "results.sqlite")
+    store = ResultStore(path, queue_size=20_000)
+    model = builtin_model()
+    idx = np.zeros(len(ENCODER.categorical), dtype=np.intp)
+    numeric = np.full(len(ENCODER.numeric), 40.0)
+    for _ in range(20_000):
+        store.submit(record(model, idx, numeric, 0.3, 1))
+    store.close()
+    assert store.written == 20_000
+
+    conn = connect(path)
+    before = os.path.getsize(path)
+    assert purge(conn, "9999-12-31") == 20_000
+    assert os.path.getsize(path) < before / 10
+    assert not os.path.exists(path + "-wal") or os.path.getsize(path + "-wal") == 0
+
+
+def rows(n, idx=0):
+    model = builtin_model()
+    numeric = np.full(len(ENCODER.numeric), 40.0)
+    return [record(model, np.full(len(ENCODER.categorical), idx, dtype=np.intp), numeric, 0.3, 1) for _ in range(n)]
+
+
+def write(path, batch):
+    results = ResultStore(path)
+    for row in batch:
+        results.submit(row)
+    results.close()
+    return results
+
+
+def test_readonly_commands_leave_the_database_untouched(tmp_path, capsys):
+    path = str(tmp_path / "results.sqlite")
+    write(path, rows(3))
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    with open(path, "rb") as f:
+        before = f.read()
+    main(["--db", path, "summary"])
+    main(["--db", path, "export", str(tmp_path / "out.csv")])
+    with open(path, "rb") as f:
+        assert f.read() == before
+    with pytest.raises(FileNotFoundError):
+        connect_readonly(str(tmp_path / "absente.sqlite"))
+
+
+def test_rows_are_decoded_with_their_own_codebook(tmp_path, monkeypatch):
+    path = str(tmp_path / "results.sqlite")
+    write(path, rows(2, idx=0))
+    # Questionnaire modifié : options dans un autre ordre pour toutes les questions
+    renamed = json.dumps([
+        {"key": q["key"], "options": list(reversed(ENCODER.option_index[j]))}
+        for j, q in enumerate(ENCODER.categorical)
+    ], ensure_ascii=False)
+    monkeypatch.setattr(store, "_codebook", lambda: renamed)
+    write(path, rows(3, idx=0))
+
+    df = decode(connect_readonly(path))
+    assert df["codebook_id"].nunique() == 2
+    for j, q in enumerate(ENCODER.categorical):
+        first, last = list(q["options"])[0], list(q["options"])[-1]
+        assert list(df[q["key"]]) == [first] * 2 + [last] * 3
+
+
+def test_legacy_codebook_is_attached_to_existing_rows(tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    old = sqlite3.connect(path)
+    old.executescript("""
+        CREATE TABLE results (id INTEGER PRIMARY KEY, day TEXT NOT NULL, model_version TEXT NOT NULL,
+            probability REAL NOT NULL, band INTEGER NOT NULL, codes BLOB NOT NULL, age_group INTEGER);
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+    """)
+    old.executemany("INSERT INTO results (day, model_version, probability, band, codes, age_group) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows(4))
+    old.execute("INSERT INTO meta VALUES ('codebook', ?)", (store._codebook(),))
+    old.commit()
+    old.close()
+
+    write(path, rows(1))
+    conn = connect_readonly(path)
+    assert conn.execute("SELECT COUNT(*), COUNT(DISTINCT codebook_id) FROM results").fetchone() == (5, 1)
+    assert conn.execute("SELECT COUNT(*) FROM meta WHERE key = 'codebook'").fetchone()[0] == 0
+
+
+def test_sentinel_in_the_middle_of_a_batch(tmp_path):
+    # submit() concurrent de close() : la sentinelle arrive avant des lignes déjà en file
+    path = str(tmp_path / "results.sqlite")
+    results = ResultStore(path, flush_interval=0.05)
+    batch = rows(5)
+    for row in batch[:3]:
+        results._queue.put(row)
+    results._queue.put(None)
+    for row in batch[3:]:
+        results._queue.put(row)
+    results._start()
+    results._thread.join(timeout=10)
+    assert not results._thread.is_alive()
+    assert results.written == 3
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import FEATURES, builtin_model
+from questions import ENCODER
+from train import LABEL, check_against_statsmodels, fit
+
+
+def sample(n=3000, seed=0):
+    # Jeu fixe : options non manquantes tirées uniformément, étiquette tirée du modèle intégré
+    rng = np.random.default_rng(seed)
+    idx = np.empty((n, len(ENCODER.categorical)), dtype=np.intp)
+    for i in range(len(ENCODER.categorical)):
+        allowed = np.flatnonzero(~ENCODER.missing[ENCODER.offsets[i]:ENCODER.offsets[i] + ENCODER.n_options[i]])
+        idx[:, i] = rng.choice(allowed, n)
+    numeric = np.column_stack([rng.integers(q["min"], q["max"] + 1, n) for q in ENCODER.numeric]).astype(np.float64)
+    X = ENCODER.encode(idx, numeric)
+    df = pd.DataFrame(X, columns=FEATURES)
+    df[LABEL] = (rng.random(n) < builtin_model().probability(X)).astype(np.float64)
+    return df
+
+
+def test_irls_matches_statsmodels():
+    pytest.importorskip("statsmodels")
+    beta_gap, cov_gap = check_against_statsmodels(sample(), rows_per_chunk=700)
+    assert beta_gap < 1e-6
+    assert cov_gap < 1e-8
+
+
+def test_fit_does_not_depend_on_chunking():
+    df = sample()
+    one = fit(lambda: iter([df]))
+    blocks = [df.iloc[i:i + 257] for i in range(0, len(df), 257)]
+    many = fit(lambda: iter(blocks))
+    np.testing.assert_allclose(many["beta"], one["beta"], rtol=0, atol=1e-10)
+    np.testing.assert_allclose(many["cov"], one["cov"], rtol=1e-9)
+    assert many["n_obs"] == one["n_obs"] == len(df)
+
+
+def test_incomplete_rows_are_dropped():
+    df = sample(500)
+    df.loc[:9, "TENSION2_reg"] = np.nan
+    df.loc[10:19, LABEL] = np.nan
+    assert fit(lambda: iter([df]))["n_obs"] == 480
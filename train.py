@@ -0,0 +1,147 @@
+import argparse
+import datetime
+import json
+import os
+import sys
+
+import numpy as np
+
+from model import FEATURES, HIGH_THRESHOLD, MODELS_DIR, THRESHOLD
+from questions import ENCODER
+
+# --- RÉESTIMATION HORS MÉMOIRE DU MODÈLE LOGISTIQUE ---
+# Même encodage que l'application. Le fichier est relu bloc par bloc à chaque
+# itération de Newton (IRLS) : seules X'WX et X'(y - p), de taille (1 + variables),
+# sont accumulées ; la matrice de design complète n'est jamais en mémoire.
+#
+#   python train.py vague2024.parquet --label burnout --check-sample 20000
+#   -> artifacts/models/<version>/model.json + covariance.npy
+
+LABEL = "burnout"
+MAX_ITER = 25
+TOL = 1e-8
+
+
+def _design(chunks, label):
+    # (Z, y) par bloc : constante en première colonne, lignes incomplètes écartées
+    for df in chunks:
+        X = ENCODER.encode(ENCODER.frame_indices(df), ENCODER.frame_numeric(df))
+        y = df[label].to_numpy(dtype=np.float64, na_value=np.nan)
+        keep = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+        Z = np.empty((int(keep.sum()), X.shape[1] + 1))
+        Z[:, 0] = 1
+        Z[:, 1:] = X[keep]
+        yield Z, y[keep]
+
+
+def _pass(chunks, label, beta):
+    # Une passe sur les données : hessienne, gradient et log-vraisemblance au point beta
+    k = len(beta)
+    H = np.zeros((k, k))
+    g = np.zeros(k)
+    loglik = 0.0
+    n = 0
+    for Z, y in _design(chunks, label):
+        eta = Z @ beta
+        p = 1 / (1 + np.exp(-eta))
+        w = p * (1 - p)
+        H += (Z * w[:, None]).T @ Z
+        g += Z.T @ (y - p)
+        loglik += float(np.sum(y * eta - np.logaddexp(0, eta)))
+        n += len(y)
+    return H, g, loglik, n
+
+
+def fit(make_chunks, label=LABEL, max_iter=MAX_ITER, tol=TOL, log=None):
+    # make_chunks() doit renvoyer un nouvel itérateur de blocs à chaque appel
+    beta = np.zeros(len(FEATURES) + 1)
+    for iteration in range(1, max_iter + 1):
+        H, g, loglik, n = _pass(make_chunks(), label, beta)
+        if n == 0:
+            raise ValueError("Aucune ligne complète avec une étiquette dans les données")
+        step = np.linalg.solve(H, g)
+        beta = beta + step
+        if log:
+            log(f"itération {iteration} : log-vraisemblance {loglik:.4f}, |Δβ| max {np.abs(step).max():.2e}")
+        if np.abs(step).max() < tol:
+            break
+    else:
+        raise RuntimeError(f"IRLS n'a pas convergé en {max_iter} itérations")
+
+    # Hessienne au point final : covariance = (X'WX)^-1
+    H, _, loglik, n = _pass(make_chunks(), label, beta)
+    return {"beta": beta, "cov": np.linalg.inv(H), "loglik": loglik, "n_obs": n, "iterations": iteration}
+
+
+def check_against_statsmodels(sample, label=LABEL, rows_per_chunk=1000):
+    # Ajuste le même échantillon en blocs et avec statsmodels, renvoie l'écart maximal
+    import statsmodels.api as sm
+
+    blocks = [sample.iloc[i:i + rows_per_chunk] for i in range(0, len(sample), rows_per_chunk)]
+    ours = fit(lambda: iter(blocks), label)
+    Z = np.vstack([Z for Z, _ in _design(blocks, label)])
+    y = np.concatenate([y for _, y in _design(blocks, label)])
+    ref = sm.Logit(y, Z).fit(disp=0, tol=1e-10, maxiter=100)
+    return (float(np.abs(ours["beta"] - ref.params).max()),
+            float(np.abs(ours["cov"] - ref.cov_params()).max()))
+
+
+def save_artifact(result, version, source, thresholds=(THRESHOLD, HIGH_THRESHOLD), models_dir=MODELS_DIR):
+    path = os.path.join(models_dir, version)
+    os.makedirs(path, exist_ok=False)
+    beta = result["beta"]
+    meta = {
+        "version": version,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "source": source,
+        "features": FEATURES,
+        "coefficients": {"const": float(beta[0]), **dict(zip(FEATURES, map(float, beta[1:])))},
+        "thresholds": list(thresholds),
+        "n_obs": result["n_obs"],
+        "loglik": result["loglik"],
+        "iterations": result["iterations"]
+    }
+    np.save(os.path.join(path, "covariance.npy"), result["cov"])
+    with open(os.path.join(path, "model.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    return path
+
+
+def main(argv=None):
+    from batch import read_chunks
+
+    parser = argparse.ArgumentParser(description="Réestime le modèle logistique sur un extrait d'enquête, hors mémoire.")
+    parser.add_argument("input", help="fichier de réponses codées avec la variable cible (CSV, Parquet ou JSONL)")
+    parser.add_argument("--label", default=LABEL, help="colonne cible (0/1)")
+    parser.add_argument("--version", help="nom de version (par défaut logit-AAAAMMJJ-HHMMSS)")
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    parser.add_argument("--max-iter", type=int, default=MAX_ITER)
+    parser.add_argument("--tol", type=float, default=TOL)
+    parser.add_argument("--check-sample", type=int, default=0,
+                        help="compare d'abord à statsmodels sur les N premières lignes")
+    parser.add_argument("--activate", action="store_true", help="active la nouvelle version dans le registre")
+    args = parser.parse_args(argv)
+
+    def log(msg):
+        print(msg, file=sys.stderr)
+
+    if args.check_sample:
+        sample = next(read_chunks(args.input, args.check_sample))
+        d_beta, d_cov = check_against_statsmodels(sample, args.label)
+        log(f"Contrôle statsmodels ({len(sample)} lignes) : écart max coefficients {d_beta:.2e}, covariance {d_cov:.2e}")
+        if d_beta > 1e-6:
+            sys.exit("Écart avec statsmodels trop important : artefact non écrit")
+
+    result = fit(lambda: read_chunks(args.input, args.chunksize), args.label, args.max_iter, args.tol, log)
+    version = args.version or datetime.datetime.now().strftime("logit-%Y%m%d-%H%M%S")
+    path = save_artifact(result, version, os.path.basename(args.input))
+    log(f"{result['n_obs']} observations, {result['iterations']} itérations -> {path}")
+    if args.activate:
+        from registry import REGISTRY
+
+        REGISTRY.activate(version)
+        log(f"Version active : {version}")
+
+
+if __name__ == "__main__":
+    main()
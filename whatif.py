@@ -0,0 +1,53 @@
+import numpy as np
+
+from questions import ENCODER
+
+# --- PANNEAU « ET SI… » ---
+# Toutes les alternatives à une seule réponse (une option différente pour une question
+# modifiable) sont construites comme une matrice de perturbations puis scorées en un
+# seul produit matriciel.
+
+
+class WhatIf:
+    def __init__(self, encoder):
+        self.encoder = encoder
+        questions, options = [], []
+        for i, q in enumerate(encoder.categorical):
+            if not q.get("modifiable") or not q["columns"]:
+                continue
+            rows = encoder.table[encoder.offsets[i]:encoder.offsets[i] + encoder.n_options[i]]
+            seen = set()
+            for o, row in enumerate(rows):
+                # Options manquantes exclues ; options de même encodage dédoublonnées
+                key = row.tobytes()
+                if encoder.missing[encoder.offsets[i] + o] or key in seen:
+                    continue
+                seen.add(key)
+                questions.append(i)
+                options.append(o)
+        self.questions = np.array(questions, dtype=np.intp)
+        self.options = np.array(options, dtype=np.intp)
+
+    def deltas(self, model, idx, numeric):
+        # Renvoie (question, option, probabilité) pour chaque alternative différente de la réponse actuelle
+        current = self.encoder.offsets[self.questions] + idx[self.questions]
+        alternative = self.encoder.offsets[self.questions] + self.options
+        differs = (self.encoder.table[current] != self.encoder.table[alternative]).any(axis=1)
+        q, o = self.questions[differs], self.options[differs]
+
+        perturbed = np.repeat(idx[None, :], len(q), axis=0)
+        perturbed[np.arange(len(q)), q] = o
+        X = self.encoder.encode(perturbed, np.broadcast_to(numeric, (len(q), len(numeric))))
+        return q, o, model.probability(X)
+
+    def improvements(self, model, idx, numeric, proba, top=None):
+        # Alternatives qui réduisent le risque, de la plus forte à la plus faible réduction
+        q, o, alt = self.deltas(model, idx, numeric)
+        reduction = proba - alt
+        order = np.argsort(-reduction)
+        order = order[reduction[order] > 0][:top]
+        labels = [list(self.encoder.categorical[i]["options"]) for i in q]
+        return [(self.encoder.categorical[q[k]], labels[k][o[k]], float(alt[k]), float(reduction[k])) for k in order]
+
+
+WHATIF = WhatIf(ENCODER)